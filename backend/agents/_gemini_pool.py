@@ -0,0 +1,37 @@
+"""
+Shared Gemini model instances
+Agents reuse one GenerativeModel per (model name, config) instead of building their own
+"""
+
+import google.generativeai as genai
+from typing import Dict, FrozenSet, Optional, Tuple
+
+_MODEL_REGISTRY: Dict[Tuple[str, Optional[str], FrozenSet], genai.GenerativeModel] = {}
+
+
+def get_model(
+    name: str,
+    system_instruction: Optional[str] = None,
+    **generation_config
+) -> genai.GenerativeModel:
+    """
+    Get a shared GenerativeModel, creating it on first use
+
+    Args:
+        name: Gemini model name (e.g., 'gemini-1.5-pro')
+        system_instruction: Optional system prompt
+        **generation_config: temperature, top_p, top_k, max_output_tokens, ...
+
+    Returns:
+        Process-wide GenerativeModel for this name + config
+    """
+    key = (name, system_instruction, frozenset(generation_config.items()))
+    model = _MODEL_REGISTRY.get(key)
+    if model is None:
+        model = genai.GenerativeModel(
+            name,
+            system_instruction=system_instruction,
+            generation_config=generation_config or None
+        )
+        _MODEL_REGISTRY[key] = model
+    return model
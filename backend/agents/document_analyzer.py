@@ -4,19 +4,151 @@ Analyzes legal documents (contracts, agreements) and identifies risks
 """
 
 import google.generativeai as genai
+import asyncio
+import logging
 import os
 import json
+import json5
+import msgspec
+import tempfile
 from dotenv import load_dotenv
-from typing import Dict, List
+from pydantic import BaseModel
+from typing import Dict, List, Optional
 import sys
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from backend.rag.vector_store import LegalRAG
+from backend.agents._gemini_pool import get_model
+from backend.rag.vector_store import ArticleHit, get_rag
+from backend.rag.semantic_cache import SemanticCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Response schemas - Gemini structured output returns strict JSON matching these
+
+class ContractClauses(BaseModel):
+    parties: List[str]
+    subject: str
+    price: str
+    duration: str
+    termination: str
+    liability: str
+
+
+class ContractRisk(BaseModel):
+    risk: str
+    severity: str  # high/medium/low
+    explanation: str
+    relevant_article: str
+
+
+class SummarySection(BaseModel):
+    summary: str
+
+
+class RisksSection(BaseModel):
+    risks: List[ContractRisk]
+
+
+class MissingClausesSection(BaseModel):
+    missing_clauses: List[str]
+
+
+class RecommendationsSection(BaseModel):
+    recommendations: List[str]
+
+
+ANALYSIS_ROLE = "Tu esi Lietuvos teisės ekspertas, specializuojantis sutarčių analizėje."
+
+# Interactive analysis: one small Gemini call per section, run in parallel.
+# Each section has its own instruction, schema, output budget and temperature.
+ANALYSIS_SECTIONS = {
+    'summary': {
+        'instruction': f"""{ANALYSIS_ROLE}
+
+UŽDUOTIS: Parašyk trumpą sutarties SANTRAUKĄ (2-3 sakiniai).""",
+        'schema': SummarySection,
+        'max_output_tokens': 256,
+        'temperature': 0.1,
+    },
+    'risks': {
+        'instruction': f"""{ANALYSIS_ROLE}
+
+UŽDUOTIS: Identifikuok galimas RIZIKAS (kas gali būti problema).
+
+SVARBU:
+- Būk konkretus ir aiškus
+- Nurodyk konkrečius straipsnius, jei remiesi įstatymais
+- Įvertink rizikos lygį: high/medium/low""",
+        'schema': RisksSection,
+        'max_output_tokens': 1024,
+        'temperature': 0.0,
+    },
+    'missing_clauses': {
+        'instruction': f"""{ANALYSIS_ROLE}
+
+UŽDUOTIS: Nurodyk TRŪKSTAMAS SĄLYGAS (ko trūksta sutartyje).
+
+SVARBU:
+- Būk konkretus ir aiškus""",
+        'schema': MissingClausesSection,
+        'max_output_tokens': 512,
+        'temperature': 0.1,
+    },
+    'recommendations': {
+        'instruction': f"""{ANALYSIS_ROLE}
+
+UŽDUOTIS: Pateik REKOMENDACIJAS (kaip patobulinti sutartį).
+
+SVARBU:
+- Būk konkretus ir aiškus
+- Nurodyk konkrečius straipsnius, jei remiesi įstatymais""",
+        'schema': RecommendationsSection,
+        'max_output_tokens': 768,
+        'temperature': 0.2,
+    },
+}
+
+# Full risk analysis instruction for batch jobs (one request per contract)
+ANALYSIS_INSTRUCTION = """Tu esi Lietuvos teisės ekspertas, specializuojantis sutarčių analizėje.
+
+UŽDUOTIS:
+1. Identifikuok galimas RIZIKAS (kas gali būti problema)
+2. Nurodyk TRŪKSTAMAS SĄLYGAS (ko trūksta sutartyje)
+3. Pateik REKOMENDACIJAS (kaip patobulinti)
+4. Parašyk trumpą SANTRAUKĄ
+
+SVARBU:
+- Būk konkretus ir aiškus
+- Nurodyk konkrečius straipsnius, jei remiesi įstatymais
+- Įvertink rizikos lygį: high/medium/low
+- Grąžink TIKTAI JSON formatą (be markdown)
+
+JSON FORMATAS:
+{
+    "summary": "Trumpa sutarties santrauka (2-3 sakiniai)",
+    "risks": [
+        {
+            "risk": "Rizikos aprašymas",
+            "severity": "high/medium/low",
+            "explanation": "Kodėl tai rizika",
+            "relevant_article": "Straipsnis (jei yra)"
+        }
+    ],
+    "missing_clauses": [
+        "Trūkstama sąlyga 1",
+        "Trūkstama sąlyga 2"
+    ],
+    "recommendations": [
+        "Rekomendacija 1",
+        "Rekomendacija 2"
+    ]
+}"""
+
 
 class DocumentAnalyzer:
     """
@@ -32,6 +164,18 @@ class DocumentAnalyzer:
         "general": None
     }
     
+    # One entry of the "RELEVANTIŠKI ĮSTATYMAI" prompt section
+    LAW_CONTEXT_TEMPLATE = "[{index}] {law_title}, Straipsnis {article_number}: {article_title}\n{preview}..."
+    
+    # Gemini Batch Mode (non-interactive bulk analysis)
+    BATCH_MODEL = 'gemini-2.5-flash'
+    BATCH_DONE_STATES = {
+        'JOB_STATE_SUCCEEDED',
+        'JOB_STATE_FAILED',
+        'JOB_STATE_CANCELLED',
+        'JOB_STATE_EXPIRED',
+    }
+    
     def __init__(self):
         # Configure Gemini
         api_key = os.getenv('GEMINI_API_KEY')
@@ -39,22 +183,32 @@ class DocumentAnalyzer:
             raise ValueError("GEMINI_API_KEY not found in environment")
         
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(
+        self.model = get_model(
             'gemini-1.5-pro',
-            generation_config={
-                'temperature': 0.1,  # Consistent contract analysis
-                'top_p': 0.95,
-                'top_k': 40,
-                'max_output_tokens': 3072,
-            }
+            temperature=0.1,  # Consistent contract analysis
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=3072,
         )
+        self.section_models = {
+            name: get_model(
+                'gemini-1.5-pro',
+                system_instruction=section['instruction'],
+                temperature=section['temperature'],
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=section['max_output_tokens'],
+            )
+            for name, section in ANALYSIS_SECTIONS.items()
+        }
         
         # Initialize RAG system
-        self.rag = LegalRAG()
+        self.rag = get_rag()
+        self.search_cache = SemanticCache(self.rag.embed_query)
         
-        print("[OK] Document Analyzer initialized")
+        logger.info("Document Analyzer initialized")
     
-    def analyze_contract(
+    async def analyze_contract(
         self,
         contract_text: str,
         contract_type: str = "general",
@@ -79,27 +233,23 @@ class DocumentAnalyzer:
                 'confidence': str
             }
         """
-        print("="*70)
-        print("📄 DOCUMENT ANALYZER - ANALYZING CONTRACT")
-        print("="*70)
-        print(f"\nContract type: {contract_type}")
-        print(f"Text length: {len(contract_text)} characters\n")
-        
-        # Step 1: Extract key clauses
-        print("STEP 1: Extracting key clauses...")
-        clauses = self._extract_clauses(contract_text)
-        
-        # Step 2: Find relevant laws using RAG
-        print("\nSTEP 2: Finding relevant laws...")
-        relevant_laws = self._find_relevant_laws(
-            contract_text,
-            contract_type
+        logger.info("Analyzing contract (type: %s, %d characters)", contract_type, len(contract_text))
+        
+        # Step 1 + 2: Extract key clauses and find relevant laws (RAG) concurrently
+        # - neither depends on the other, so total latency is max(), not sum()
+        logger.debug("STEP 1: Extracting key clauses...")
+        logger.debug("STEP 2: Finding relevant laws...")
+        views = self._contract_views(contract_text)
+        clauses_task = asyncio.create_task(self._extract_clauses(views['clauses']))
+        laws_task = asyncio.create_task(
+            self._find_relevant_laws(views['rag'], contract_type)
         )
+        clauses, relevant_laws = await asyncio.gather(clauses_task, laws_task)
         
         # Step 3: Analyze with AI
-        print("\nSTEP 3: Analyzing with AI...")
-        analysis = self._analyze_with_ai(
-            contract_text,
+        logger.debug("STEP 3: Analyzing with AI...")
+        analysis = await self._analyze_with_ai(
+            views['analysis'],
             clauses,
             relevant_laws,
             contract_type
@@ -108,23 +258,45 @@ class DocumentAnalyzer:
         # Step 4: Calculate confidence
         confidence = self._calculate_confidence(relevant_laws, analysis)
         
-        print("\n" + "="*70)
-        print("✅ ANALYSIS COMPLETE")
-        print("="*70)
+        logger.info("Contract analysis complete")
         
         return {
             **analysis,
             'contract_type': contract_type,
-            'relevant_laws': relevant_laws[:5],  # Top 5 most relevant
+            'relevant_laws': msgspec.to_builtins(relevant_laws[:5]),  # Top 5 most relevant
             'confidence': confidence
         }
     
-    def _extract_clauses(self, contract_text: str) -> Dict:
-        """Extract key clauses from contract using AI"""
+    def analyze_contract_sync(
+        self,
+        contract_text: str,
+        contract_type: str = "general",
+        language: str = "lt"
+    ) -> Dict:
+        """Blocking wrapper around analyze_contract for scripts and non-async callers"""
+        return asyncio.run(
+            self.analyze_contract(contract_text, contract_type, language)
+        )
+    
+    def _contract_views(self, contract_text: str) -> Dict[str, str]:
+        """
+        Slice the contract once into the prefixes each step needs
+        
+        Returns:
+            {'rag': query prefix, 'clauses': clause extraction prefix, 'analysis': analysis prefix}
+        """
+        return {
+            'rag': contract_text[:500],  # usually contains the main subject
+            'clauses': contract_text[:3000],
+            'analysis': contract_text[:4000],
+        }
+    
+    async def _extract_clauses(self, contract_text: str) -> Dict:
+        """Extract key clauses from contract using AI (expects the 'clauses' view)"""
         prompt = f"""Išanalizuok šią sutartį ir ištrauk pagrindines sąlygas.
 
 SUTARTIS:
-{contract_text[:3000]}
+{contract_text}
 
 Grąžink TIKTAI JSON formatą (be jokio kito teksto):
 {{
@@ -137,126 +309,325 @@ Grąžink TIKTAI JSON formatą (be jokio kito teksto):
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON from response
-            text = response.text.strip()
-            # Remove markdown code blocks if present
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            
-            clauses = json.loads(text)
-            print(f"   Extracted {len(clauses)} key clauses")
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={
+                    'response_mime_type': 'application/json',
+                    'response_schema': ContractClauses,
+                }
+            )
+            clauses = json.loads(response.text)
+            logger.debug("Extracted %d key clauses", len(clauses))
             return clauses
         except Exception as e:
-            print(f"   ⚠️ Could not extract clauses: {e}")
+            logger.warning("Could not extract clauses: %s", e)
             return {}
     
-    def _find_relevant_laws(
+    async def _find_relevant_laws(
+        self,
+        contract_text: str,
+        contract_type: str
+    ) -> List[ArticleHit]:
+        """Find relevant laws using RAG system (expects the 'rag' view)"""
+        # LegalRAG is synchronous (embedding + ChromaDB) - keep it off the event loop
+        return await asyncio.to_thread(
+            self._search_laws,
+            contract_text,
+            contract_type
+        )
+    
+    def _search_laws(
         self,
         contract_text: str,
         contract_type: str
-    ) -> List[Dict]:
-        """Find relevant laws using RAG system"""
+    ) -> List[ArticleHit]:
+        """Blocking RAG lookup shared by the interactive and batch paths (expects the 'rag' view)"""
         category = self.CATEGORY_MAP.get(contract_type, None)
         
-        # Use first 500 chars as query (usually contains main subject)
-        query = contract_text[:500]
-        
         try:
-            results = self.rag.search_relevant_articles(
-                query=query,
+            results = self.search_cache.lookup_or_call(
+                contract_text,
+                self.rag.search_relevant_articles,
                 top_k=10,
                 category=category
             )
-            print(f"   Found {len(results)} relevant articles")
+            logger.debug("Found %d relevant articles", len(results))
             return results
         except Exception as e:
-            print(f"   ⚠️ Could not find relevant laws: {e}")
+            logger.warning("Could not find relevant laws: %s", e)
             return []
     
-    def _analyze_with_ai(
+    def _search_laws_batch(
+        self,
+        contracts: List[Dict],
+        views_by_id: Dict[str, Dict[str, str]]
+    ) -> Dict[str, List[ArticleHit]]:
+        """RAG lookup for many contracts - one batched search per legal category"""
+        ids_by_category: Dict[str, List[str]] = {}
+        for contract in contracts:
+            category = self.CATEGORY_MAP.get(contract.get('contract_type', 'general'), None)
+            ids_by_category.setdefault(category, []).append(str(contract['id']))
+        
+        relevant_laws_by_id = {}
+        for category, contract_ids in ids_by_category.items():
+            try:
+                results = self.rag.search_batch(
+                    [views_by_id[cid]['rag'] for cid in contract_ids],
+                    top_k=10,
+                    category=category
+                )
+            except Exception as e:
+                logger.warning("Could not find relevant laws: %s", e)
+                results = [[] for _ in contract_ids]
+            relevant_laws_by_id.update(zip(contract_ids, results, strict=True))
+        
+        return relevant_laws_by_id
+    
+    def _build_analysis_prompt(
         self,
         contract_text: str,
-        clauses: Dict,
-        relevant_laws: List[Dict],
+        relevant_laws: List[ArticleHit],
         contract_type: str
-    ) -> Dict:
-        """Perform deep analysis with AI"""
+    ) -> str:
+        """
+        Build the per-contract part of the risk analysis prompt
+        (shared by interactive and batch paths, expects the 'analysis' view;
+        instructions live in ANALYSIS_SECTIONS / ANALYSIS_INSTRUCTION)
+        """
         # Build context from relevant laws
-        law_context = "\n\n".join([
-            f"[{i+1}] {law['law_title']}, Straipsnis {law['article_number']}: {law['article_title']}\n{law['content'][:300]}..."
-            for i, law in enumerate(relevant_laws[:5])
-        ]) if relevant_laws else "Nėra relevantiškų įstatymų duomenų bazėje."
+        if relevant_laws:
+            parts = []
+            for i, law in enumerate(relevant_laws[:5], 1):
+                parts.append(self.LAW_CONTEXT_TEMPLATE.format_map({
+                    'index': i,
+                    'law_title': law.law_title,
+                    'article_number': law.article_number,
+                    'article_title': law.article_title,
+                    'preview': law.content_preview or law.content[:300],
+                }))
+            law_context = "\n\n".join(parts)
+        else:
+            law_context = "Nėra relevantiškų įstatymų duomenų bazėje."
         
-        prompt = f"""Tu esi Lietuvos teisės ekspertas, specializuojantis sutarčių analizėje.
-
-SUTARTIS ({contract_type}):
-{contract_text[:4000]}
+        return f"""SUTARTIS ({contract_type}):
+{contract_text}
 
 RELEVANTIŠKI ĮSTATYMAI:
-{law_context}
-
-UŽDUOTIS:
-1. Identifikuok galimas RIZIKAS (kas gali būti problema)
-2. Nurodyk TRŪKSTAMAS SĄLYGAS (ko trūksta sutartyje)
-3. Pateik REKOMENDACIJAS (kaip patobulinti)
-4. Parašyk trumpą SANTRAUKĄ
-
-SVARBU:
-- Būk konkretus ir aiškus
-- Nurodyk konkrečius straipsnius, jei remiesi įstatymais
-- Įvertink rizikos lygį: high/medium/low
-- Grąžink TIKTAI JSON formatą (be markdown)
-
-JSON FORMATAS:
-{{
-    "summary": "Trumpa sutarties santrauka (2-3 sakiniai)",
-    "risks": [
-        {{
-            "risk": "Rizikos aprašymas",
-            "severity": "high/medium/low",
-            "explanation": "Kodėl tai rizika",
-            "relevant_article": "Straipsnis (jei yra)"
-        }}
-    ],
-    "missing_clauses": [
-        "Trūkstama sąlyga 1",
-        "Trūkstama sąlyga 2"
-    ],
-    "recommendations": [
-        "Rekomendacija 1",
-        "Rekomendacija 2"
-    ]
-}}"""
+{law_context}"""
+    
+    async def _analyze_with_ai(
+        self,
+        contract_text: str,
+        clauses: Dict,
+        relevant_laws: List[ArticleHit],
+        contract_type: str
+    ) -> Dict:
+        """Perform deep analysis with AI - summary, risks, missing clauses and recommendations in parallel"""
+        prompt = self._build_analysis_prompt(contract_text, relevant_laws, contract_type)
+        
+        sections = await asyncio.gather(*[
+            self._generate_section(name, prompt)
+            for name in ANALYSIS_SECTIONS
+        ])
         
+        analysis = {}
+        for section in sections:
+            analysis.update(section)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Identified %d risks (%s), %d missing clauses",
+                len(analysis['risks']),
+                ", ".join(r.get('severity', '?') for r in analysis['risks']),
+                len(analysis['missing_clauses'])
+            )
+        return analysis
+    
+    async def _generate_section(self, name: str, prompt: str) -> Dict:
+        """Generate one analysis section; falls back to an empty section on errors"""
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
+            response = await self.section_models[name].generate_content_async(
+                prompt,
+                generation_config={
+                    'response_mime_type': 'application/json',
+                    'response_schema': ANALYSIS_SECTIONS[name]['schema'],
+                },
+                stream=True
+            )
             
-            # Remove markdown code blocks
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
+            # Accumulate chunks in a list and only try to parse when a chunk closes
+            # a brace - the top-level object can't be complete before that
+            chunks = []
+            analysis = None
+            async for chunk in response:
+                chunks.append(chunk.text)
+                if not chunk.text.rstrip().endswith('}'):
+                    continue
+                try:
+                    analysis = json.loads("".join(chunks))
+                    break
+                except json.JSONDecodeError:
+                    continue
             
-            analysis = json.loads(text)
-            print(f"   Identified {len(analysis.get('risks', []))} risks")
-            print(f"   Found {len(analysis.get('missing_clauses', []))} missing clauses")
-            return analysis
+            if analysis is None:
+                analysis = json.loads("".join(chunks))
+            return {name: analysis[name]}
         except Exception as e:
-            print(f"   ⚠️ Analysis error: {e}")
-            return {
-                'summary': "Klaida analizuojant sutartį",
-                'risks': [],
-                'missing_clauses': [],
-                'recommendations': []
+            logger.warning("Analysis error (%s): %s", name, e)
+            return {name: self._failed_analysis()[name]}
+    
+    @staticmethod
+    def _failed_analysis() -> Dict:
+        """Placeholder analysis returned when Gemini output is unusable"""
+        return {
+            'summary': "Klaida analizuojant sutartį",
+            'risks': [],
+            'missing_clauses': [],
+            'recommendations': []
+        }
+    
+    def submit_contracts_batch(self, contracts: List[Dict]) -> tuple:
+        """
+        Submit many contracts to Gemini Batch Mode and return without waiting
+        
+        Batch jobs are ~50% cheaper and have much higher rate limits than
+        interactive calls, but may take up to 24h - use only for non-urgent
+        bulk work (review queues, re-analysis after law updates). Persist the
+        returned job name and pick the results up with collect_contracts_batch().
+        
+        Args:
+            contracts: List of {'id', 'contract_text', 'contract_type'} dicts
+        
+        Returns:
+            (job_name, {contract_id: relevant_laws}) - the laws as plain dicts (top 5),
+            needed again when the results are collected
+        """
+        client = self._batch_client()
+        
+        logger.info("Batch analysis of %d contracts", len(contracts))
+        
+        # Step 1: Build JSONL requests (batched RAG lookup, same prompt as interactive path)
+        logger.debug("STEP 1: Building batch requests...")
+        views_by_id = {
+            str(c['id']): self._contract_views(c['contract_text']) for c in contracts
+        }
+        relevant_laws_by_id = self._search_laws_batch(contracts, views_by_id)
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.jsonl', encoding='utf-8', delete=False
+        ) as f:
+            batch_path = f.name
+            for contract in contracts:
+                contract_id = str(contract['id'])
+                contract_type = contract.get('contract_type', 'general')
+                views = views_by_id[contract_id]
+                relevant_laws = relevant_laws_by_id[contract_id]
+                
+                prompt = self._build_analysis_prompt(
+                    views['analysis'],
+                    relevant_laws,
+                    contract_type
+                )
+                f.write(json.dumps({
+                    'key': contract_id,
+                    'request': {
+                        'system_instruction': {'parts': [{'text': ANALYSIS_INSTRUCTION}]},
+                        'contents': [{'parts': [{'text': prompt}]}],
+                        'generation_config': {'response_mime_type': 'application/json'}
+                    }
+                }, ensure_ascii=False) + "\n")
+        
+        # Step 2: Upload and submit the job
+        logger.debug("STEP 2: Submitting batch job...")
+        try:
+            uploaded = client.files.upload(
+                file=batch_path,
+                config={'display_name': 'contract_analysis', 'mime_type': 'jsonl'}
+            )
+        finally:
+            os.remove(batch_path)
+        
+        batch_job = client.batches.create(
+            model=self.BATCH_MODEL,
+            src=uploaded.name,
+            config={'display_name': 'contract_analysis'}
+        )
+        logger.info("Batch job submitted: %s", batch_job.name)
+        
+        return batch_job.name, {
+            contract_id: msgspec.to_builtins(laws[:5])
+            for contract_id, laws in relevant_laws_by_id.items()
+        }
+    
+    @classmethod
+    def collect_contracts_batch(cls, job_name: str, contracts: List[Dict]) -> Optional[Dict[str, Dict]]:
+        """
+        Check a submitted batch job once and return its results if it has finished
+        
+        Needs no RAG or Gemini models, so a poller can call it without building
+        the analyzer.
+        
+        Args:
+            job_name: Name returned by submit_contracts_batch()
+            contracts: List of {'id', 'contract_type', 'relevant_laws'} dicts
+        
+        Returns:
+            None while the job is still running, {} if it failed, otherwise
+            {contract_id: analysis} in the same shape as analyze_contract()
+        """
+        client = cls._batch_client()
+        batch_job = client.batches.get(name=job_name)
+        if batch_job.state.name not in cls.BATCH_DONE_STATES:
+            return None
+        
+        if batch_job.state.name != 'JOB_STATE_SUCCEEDED':
+            logger.error("Batch job %s ended with %s", job_name, batch_job.state.name)
+            return {}
+        
+        # Split responses back to contract IDs
+        logger.debug("Collecting results of batch job %s...", job_name)
+        content = client.files.download(file=batch_job.dest.file_name)
+        contracts_by_id = {str(c['id']): c for c in contracts}
+        
+        results = {}
+        for line in content.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            contract_id = item['key']
+            contract = contracts_by_id.get(contract_id, {})
+            relevant_laws = contract.get('relevant_laws') or []
+            
+            try:
+                text = item['response']['candidates'][0]['content']['parts'][0]['text']
+                # No response schema in batch requests - json5 tolerates trailing commas/comments
+                analysis = json5.loads(text)
+            except Exception as e:
+                logger.warning("Analysis error for %s: %s", contract_id, e)
+                analysis = cls._failed_analysis()
+            
+            results[contract_id] = {
+                **analysis,
+                'contract_type': contract.get('contract_type', 'general'),
+                'relevant_laws': relevant_laws,
+                'confidence': cls._calculate_confidence(relevant_laws, analysis)
             }
+        
+        logger.info("Batch analysis complete (%d contracts)", len(results))
+        return results
+    
+    @staticmethod
+    def _batch_client():
+        """google-genai client (the new SDK is only needed for batch jobs)"""
+        from google import genai as genai_client
+        return genai_client.Client(api_key=os.getenv('GEMINI_API_KEY'))
     
+    def get_stats(self) -> Dict:
+        """Get RAG search cache statistics"""
+        return {'semantic_cache_stats': self.search_cache.get_stats()}
+    
+    @staticmethod
     def _calculate_confidence(
-        self,
-        relevant_laws: List[Dict],
+        relevant_laws: List,
         analysis: Dict
     ) -> str:
         """Calculate confidence level of the analysis"""
@@ -311,7 +682,7 @@ if __name__ == "__main__":
     Sutartis galioja nuo 2026-02-01.
     """
     
-    result = analyzer.analyze_contract(
+    result = analyzer.analyze_contract_sync(
         contract_text=test_contract,
         contract_type="employment"
     )
@@ -1,131 +1,190 @@
 
 import google.generativeai as genai
+import asyncio
+import logging
 import os
+import time
 from dotenv import load_dotenv
 from datetime import datetime
-import json
+import orjson
 import sys
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from backend.agents._gemini_pool import get_model
 from backend.scrapers.etar_scraper import ETARScraper
 from prompts.legal_prompts import get_labor_complaint_prompt
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class DocumentGenerator:
     """
     AI-powered legal document generator
     """
     
+    # Darbo kodeksas articles used as legal grounds for labor complaints
+    LABOR_COMPLAINT_ARTICLES = (52,)  # 52 - remote work
+    
+    # Articles preloaded at startup
+    WARM_ARTICLES = (52, 47, 49)
+    
     def __init__(self):
         # Configure Gemini
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
             # For validation purposes allow running without key but fail on generation
-            print("⚠️ WARNING: GEMINI_API_KEY not found")
+            logger.warning("GEMINI_API_KEY not found")
         else:
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = get_model('gemini-1.5-flash')
         
         # Initialize scraper
         self.scraper = ETARScraper()
+        
+        # Rendered legal context by article set: numbers -> (expires_at, articles, context)
+        self._context_cache = {}
     
-    def generate_labor_complaint(self, user_data):
+    async def warm_cache(self):
+        """Preload frequently used articles and the labor complaint legal context"""
+        await self.scraper.fetch_articles_async(list(self.WARM_ARTICLES))
+        await self._get_legal_context(self.LABOR_COMPLAINT_ARTICLES)
+    
+    async def _get_legal_context(self, article_numbers):
         """
-        Generate labor complaint document
+        Fetch articles and render them into the prompt's legal context
         
-        Args:
-            user_data (dict): User's complaint details
-            
         Returns:
-            dict: Generated document data
+            tuple: (articles, legal_context string)
         """
-        print("="*70)
-        print("📝 GENERATING LABOR COMPLAINT")
-        print("="*70 + "\n")
-        
-        # Step 1: Fetch relevant legal articles
-        print("STEP 1: Fetching relevant legal articles...\n")
+        key = tuple(sorted(article_numbers))
+        cached = self._context_cache.get(key)
+        if cached and cached[0] > time.time():
+            return cached[1], cached[2]
         
-        # Get Article 52 (remote work) - relevant for this complaint
-        legal_articles = []
+        # Fetch all relevant articles concurrently (cached by the scraper)
+        legal_articles = await self.scraper.fetch_articles_async(list(key))
         
-        # Try to fetch article 52
-        article_52 = self.scraper.fetch_article(52)
-        if article_52:
-            legal_articles.append(article_52)
-            legal_articles.append(article_52)
-            # print(f"✅ Fetched: {article_52['title']}\n") # Can cause UnicodeEncodeError on Windows
-        else:
-            print("❌ Failed to fetch Article 52. Proceeding without specific legal context.\n")
-        
-        # Combine legal context
-        legal_context = "\n\n".join([ # Combine legal context
+        legal_context = "\n\n".join([
             f"{art['title']}\n{art['content']}" 
             for art in legal_articles
         ])
         
+        if legal_articles:
+            self._context_cache[key] = (
+                time.time() + self.scraper.ARTICLE_CACHE_TTL,
+                legal_articles,
+                legal_context
+            )
+        
+        return legal_articles, legal_context
+    
+    async def _build_complaint_prompt(self, user_data):
+        """
+        Fetch the legal grounds and build the labor complaint prompt
+        
+        Returns:
+            tuple: (legal_articles, prompt)
+        """
+        # Step 1: Fetch relevant legal articles
+        logger.debug("STEP 1: Fetching relevant legal articles...")
+        
+        legal_articles, legal_context = await self._get_legal_context(self.LABOR_COMPLAINT_ARTICLES)
+        if not legal_articles:
+            logger.warning("Failed to fetch legal articles. Proceeding without specific legal context.")
+        
         if not legal_context:
             legal_context = "Lietuvos Respublikos darbo kodeksas"
         
         # Step 2: Build prompt
-        print("STEP 2: Building AI prompt...\n")
+        logger.debug("STEP 2: Building AI prompt...")
         
         prompt = get_labor_complaint_prompt(user_data, legal_context)
         
-        print(f"✅ Prompt ready ({len(prompt)} characters)\n")
+        logger.debug("Prompt ready (%d characters)", len(prompt))
+        
+        return legal_articles, prompt
+    
+    async def generate_labor_complaint(self, user_data):
+        """
+        Generate labor complaint document
+        
+        Args:
+            user_data (dict): User's complaint details
+            
+        Returns:
+            dict: Generated document data
+        """
+        logger.info("Generating labor complaint")
+        
+        legal_articles, prompt = await self._build_complaint_prompt(user_data)
         
         # Step 3: Generate with Gemini
-        print("STEP 3: Generating document with AI...\n")
+        logger.debug("STEP 3: Generating document with AI...")
         
         if not hasattr(self, 'model'):
-             print("❌ Gemini model not initialized (missing API Key)")
+             logger.error("Gemini model not initialized (missing API Key)")
              return None
 
-        print("⏳ Calling Gemini API (this may take 10-30 seconds)...\n")
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             generated_text = response.text
             
-            print(f"✅ Document generated ({len(generated_text)} characters)\n")
+            logger.debug("Document generated (%d characters)", len(generated_text))
             
         except Exception as e:
-            print(f"❌ Gemini API Error: {e}")
+            logger.error("Gemini API Error: %s", e)
             return None
         
         # Step 4: Format and save
-        print("STEP 4: Formatting result...\n")
+        logger.debug("STEP 4: Formatting result...")
         
+        generated_at = datetime.now()
         document = {
             'type': 'labor_complaint',
             'content': generated_text,
             'metadata': {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': generated_at,  # orjson writes datetimes as ISO 8601
                 'user_data': user_data,
                 'legal_articles_used': [art['article_number'] for art in legal_articles],
             }
         }
         
         # Save to file
-        output_path = f"data/generated_complaint_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        output_path = f"data/generated_complaint_{generated_at.strftime('%Y%m%d_%H%M%S')}.json"
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(document, f, ensure_ascii=False, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(document, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
-        print(f"✅ Saved → {output_path}\n")
-        
-        # Display preview
-        print("="*70)
-        print("📄 GENERATED DOCUMENT PREVIEW:")
-        print("="*70)
-        # print(generated_text[:800]) # Can cause UnicodeEncodeError
-        print("\n... (see full document in JSON file)")
-        print("="*70)
+        logger.info("Saved generated complaint to %s", output_path)
         
         return document
+    
+    async def stream_labor_complaint(self, user_data):
+        """
+        Generate labor complaint text, yielding chunks as Gemini produces them
+        
+        Args:
+            user_data (dict): User's complaint details
+            
+        Yields:
+            str: Next piece of the generated document
+        """
+        logger.info("Streaming labor complaint")
+        
+        if not hasattr(self, 'model'):
+            logger.error("Gemini model not initialized (missing API Key)")
+            return
+        
+        _, prompt = await self._build_complaint_prompt(user_data)
+        
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
 
 
 # TEST CODE
@@ -151,7 +210,7 @@ tik nurodo, kad "taip nuspręsta vadovybėje".''',
     generator = DocumentGenerator()
     
     # Generate document
-    result = generator.generate_labor_complaint(test_data)
+    result = asyncio.run(generator.generate_labor_complaint(test_data))
     
     if result:
         print("\n" + "="*70)
@@ -1,15 +1,32 @@
-import requests
+import requests_cache
 import datetime
 import json
+import os
+import time
 
 class ESeimasAgent:
     """
     Agent for searching and tracking legal updates on e-seimas.lt
     """
     
+    # How long search pages and parsed results stay cached
+    CACHE_TTL = datetime.timedelta(hours=6)
+    
     def __init__(self):
         self.base_url = "https://e-seimas.lrs.lt"
-        self.session = requests.Session()
+        
+        # HTTP responses are cached on disk (SQLite), keyed by URL + POST body
+        os.makedirs('data', exist_ok=True)
+        self.session = requests_cache.CachedSession(
+            'data/eseimas_cache',
+            backend='sqlite',
+            expire_after=self.CACHE_TTL,
+            allowable_methods=('GET', 'POST')
+        )
+        
+        # Parsed search results: (keyword, days_back) -> (expires_at, results)
+        self._results_cache = {}
+        
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
@@ -25,6 +42,11 @@ class ESeimasAgent:
         Returns:
             list: List of found documents (dict).
         """
+        cache_key = (keyword, days_back)
+        cached = self._results_cache.get(cache_key)
+        if cached and cached[0] > time.time():
+            return list(cached[1])
+        
         print(f"🔍 [eSeimasAgent] Searching for '{keyword}' in the last {days_back} days...")
         
         # NOTE: e-seimas.lt search is complex and dynamic.
@@ -48,7 +70,13 @@ class ESeimasAgent:
              print(f"   ✅ Found simulated result: {results[0]['title']} ({mock_date})")
         
         print(f"📊 Found {len(results)} relevant documents.")
-        return results
+        
+        # Keep parsed results so a cache hit skips HTML parsing entirely
+        self._results_cache[cache_key] = (
+            time.time() + self.CACHE_TTL.total_seconds(),
+            results
+        )
+        return list(results)
 
     def check_for_amendments(self, law_name="Darbo kodeksas"):
         """
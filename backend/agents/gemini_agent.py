@@ -2,15 +2,55 @@
 Gemini AI Agent for legal consultations
 """
 import google.generativeai as genai
-from typing import Dict, Optional
+from collections import OrderedDict, deque
+from contextlib import closing
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+import os
+import sqlite3
 import uuid
 
+from backend.agents._gemini_pool import get_model
+
+SYSTEM_PROMPT = """Tu esi Lietuvos teisės ekspertas ir AI asistentas. 
+        Tavo užduotis - padėti vartotojams suprasti Lietuvos teisės aktus."""
+
 class GeminiAgent:
-    def __init__(self, api_key: str):
+    # Conversation history limits (one turn = "User: ..." + "AI: ...")
+    MAX_TURNS = 20
+    MAX_CONTEXT_TOKENS = 8000
+    # Conversations kept in memory per worker (least recently used are dropped)
+    MAX_CONVERSATIONS = 1000
+
+    def __init__(self, api_key: str, db_path: str = "data/conversations.db"):
         """Initialize Gemini agent"""
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
-        self.conversations = {}
+        # System prompt is sent as system_instruction instead of being prepended to every message
+        self.model = get_model('gemini-pro', system_instruction=SYSTEM_PROMPT)
+        # conversation_id -> (id of the last turn loaded from disk, recent messages)
+        self.conversations: OrderedDict[str, Tuple[int, Deque[str]]] = OrderedDict()
+        self.lock = asyncio.Lock()
+
+        # Turns are appended to sqlite so they survive restarts and are shared between
+        # workers; each worker picks up turns it hasn't seen before answering
+        self.db_path = db_path
+        data_dir = os.path.dirname(db_path)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    conversation_id TEXT NOT NULL,
+                    user_message TEXT NOT NULL,
+                    ai_message TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_turns_conversation
+                ON conversation_turns(conversation_id, id)
+            """)
         
     async def chat(self, message: str, conversation_id: Optional[str] = None) -> Dict:
         """
@@ -18,25 +58,87 @@ class GeminiAgent:
         """
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
-            self.conversations[conversation_id] = []
         
-        system_prompt = """Tu esi Lietuvos teisės ekspertas ir AI asistentas. 
-        Tavo užduotis - padėti vartotojams suprasti Lietuvos teisės aktus."""
+        history = await self._get_history(conversation_id)
         
-        if conversation_id in self.conversations:
-            context = "\n".join(self.conversations[conversation_id])
-            full_message = f"{system_prompt}\n\nKontekstas:\n{context}\n\nKlausimas: {message}"
+        if history:
+            await self._trim_to_token_budget(history)
+            context = "\n".join(history)
+            full_message = f"Kontekstas:\n{context}\n\nKlausimas: {message}"
         else:
-            full_message = f"{system_prompt}\n\nKlausimas: {message}"
+            full_message = f"Klausimas: {message}"
         
-        response = self.model.generate_content(full_message)
+        response = await self.model.generate_content_async(full_message)
         
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-        self.conversations[conversation_id].append(f"User: {message}")
-        self.conversations[conversation_id].append(f"AI: {response.text}")
+        # The turn reaches the in-memory history on the next _get_history
+        await asyncio.to_thread(self._save_turn, conversation_id, message, response.text)
         
         return {
             "message": response.text,
             "conversation_id": conversation_id
         }
+
+    async def _get_history(self, conversation_id: str) -> Deque[str]:
+        """Get conversation history, adding turns saved since the last call (by any worker)"""
+        while True:
+            # Read outside the lock so other conversations aren't queued behind SQLite
+            read_after, _ = self.conversations.get(conversation_id, (0, None))
+            rows = await asyncio.to_thread(self._load_turns, conversation_id, read_after)
+
+            async with self.lock:
+                if read_after and conversation_id not in self.conversations:
+                    continue  # Evicted meanwhile - rows lack the older turns, reload in full
+                last_id, history = self.conversations.pop(
+                    conversation_id, (0, deque(maxlen=self.MAX_TURNS * 2))
+                )
+                for turn_id, user_message, ai_message in rows:
+                    # Skip turns another request already merged while we were reading
+                    if turn_id <= last_id:
+                        continue
+                    history.append(f"User: {user_message}")
+                    history.append(f"AI: {ai_message}")
+                    last_id = turn_id
+
+                self.conversations[conversation_id] = (last_id, history)
+                if len(self.conversations) > self.MAX_CONVERSATIONS:
+                    self.conversations.popitem(last=False)
+            return history
+
+    def _load_turns(self, conversation_id: str, after_id: int) -> List[Tuple[int, str, str]]:
+        """Read up to MAX_TURNS most recent turns newer than after_id, oldest first (blocking)"""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute("""
+                SELECT id, user_message, ai_message FROM conversation_turns
+                WHERE conversation_id = ? AND id > ?
+                ORDER BY id DESC LIMIT ?
+            """, (conversation_id, after_id, self.MAX_TURNS)).fetchall()
+        return rows[::-1]
+
+    def _save_turn(self, conversation_id: str, user_message: str, ai_message: str):
+        """Append one question/answer pair to the conversation (blocking)"""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute("""
+                INSERT INTO conversation_turns (conversation_id, user_message, ai_message)
+                VALUES (?, ?, ?)
+            """, (conversation_id, user_message, ai_message))
+
+    async def _trim_to_token_budget(self, history: Deque[str]):
+        """
+        Drop the oldest question/answer pairs until the context fits MAX_CONTEXT_TOKENS
+
+        The context is counted once; dropped turns are subtracted with an estimate
+        (the counted tokens spread over the characters) instead of re-counting.
+        """
+        context_chars = sum(len(m) for m in history)
+        # A token covers at least about one character - short contexts can't be over budget
+        if len(history) <= 2 or context_chars <= self.MAX_CONTEXT_TOKENS:
+            return
+
+        count = await self.model.count_tokens_async("\n".join(history))
+        tokens_per_char = count.total_tokens / context_chars
+
+        async with self.lock:
+            # Re-measured under the lock - another request may have trimmed meanwhile
+            context_chars = sum(len(m) for m in history)
+            while len(history) > 2 and context_chars * tokens_per_char > self.MAX_CONTEXT_TOKENS:
+                context_chars -= len(history.popleft()) + len(history.popleft())
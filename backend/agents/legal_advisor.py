@@ -4,7 +4,12 @@ Answers legal questions using RAG-powered semantic search
 """
 
 import google.generativeai as genai
+import hashlib
+import msgspec
+import logging
 import os
+from collections import Counter, OrderedDict
+from statistics import fmean
 from dotenv import load_dotenv
 from typing import Dict, Optional, List
 import sys
@@ -12,17 +17,42 @@ import sys
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from backend.rag.vector_store import LegalRAG
+from backend.agents._gemini_pool import get_model
+from backend.rag.vector_store import ArticleHit, get_rag
+from backend.rag.semantic_cache import SemanticCache
 from backend.agents.smart_fetcher import SmartLegalFetcher
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Static part of every Q&A prompt - sent once as the model's system instruction
+SYSTEM_INSTRUCTION = """Tu esi Lietuvos teisės ekspertas. Tavo užduotis - atsakyti į klausimą remiantis pateiktais įstatymų straipsniais.
+
+SVARBU:
+- Atsakyk TIKTAI remiantis pateiktais straipsniais
+- Nurodyk konkrečius straipsnius, kuriais remiesi
+- Jei straipsniai nepakankami atsakymui - pasakyk tai
+- Atsakymas turi būti aiškus ir suprantamas ne teisininkui
+- Naudok lietuvių kalbą"""
+
 
 class LegalAdvisor:
     """
     AI-powered legal advisor that can answer questions about any Lithuanian law
     """
     
+    # One entry of the legal context section in the prompt
+    CONTEXT_TEMPLATE = (
+        "[{index}] {law_title}\n"
+        "    Straipsnis {article_number}: {article_title}\n"
+        "    {content}\n"
+    )
+    
+    # Maximum number of final answers kept in the exact-match answer cache
+    ANSWER_CACHE_SIZE = 512
+    
     def __init__(self):
         # Configure Gemini
         api_key = os.getenv('GEMINI_API_KEY')
@@ -30,23 +60,27 @@ class LegalAdvisor:
             raise ValueError("GEMINI_API_KEY not found in environment")
         
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(
+        self.model = get_model(
             'gemini-1.5-pro',
-            generation_config={
-                'temperature': 0.1,  # Very deterministic for legal accuracy
-                'top_p': 0.95,
-                'top_k': 40,
-                'max_output_tokens': 2048,
-            }
+            system_instruction=SYSTEM_INSTRUCTION,
+            temperature=0.1,  # Very deterministic for legal accuracy
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=2048,
         )
         
         # Initialize RAG system (fallback)
-        self.rag = LegalRAG()
+        self.rag = get_rag()
+        self.search_cache = SemanticCache(self.rag.embed_query)
+        
+        # Exact-match cache of final answers (tier 1, in front of the semantic search cache)
+        self.answer_cache: OrderedDict[str, Dict] = OrderedDict()
+        self._rag_version = self.rag.corpus_version()
         
         # Initialize Smart Fetcher (primary)
         self.fetcher = SmartLegalFetcher()
         
-        print("[OK] Legal Advisor initialized")
+        logger.info("Legal Advisor initialized")
     
     def answer_legal_question(
         self, 
@@ -70,30 +104,50 @@ class LegalAdvisor:
                 'category': str
             }
         """
-        print("="*70)
-        print("⚖️ LEGAL ADVISOR - ANSWERING QUESTION")
-        print("="*70)
-        print(f"\n❓ Question: {question}\n")
+        logger.info("Answering question: %s", question)
         
-        # Step 1: Try Smart Fetcher first, fallback to RAG
-        print("STEP 1: Searching for relevant legal articles...\n")
+        # Cached answers and searches are dropped once the RAG corpus is re-indexed
+        rag_version = self.rag.corpus_version()
+        if rag_version != self._rag_version:
+            logger.info("RAG corpus re-indexed - dropping cached answers")
+            self.invalidate()
+            self._rag_version = rag_version
         
         # Detect which law to use from question
         law_id = self._detect_law_from_question(question, category)
+        law = self._get_fetcher_law(law_id) if law_id else None
+        
+        cache_key = self._answer_cache_key(question, category, top_k, law)
+        cached = self.answer_cache.get(cache_key)
+        if cached:
+            self.answer_cache.move_to_end(cache_key)
+            logger.debug("Answer cache HIT")
+            return cached
+        
+        # Step 1: Try Smart Fetcher first, fallback to RAG
+        logger.debug("STEP 1: Searching for relevant legal articles...")
         
         if law_id:
             # Use Smart Fetcher
-            print(f"   Using Smart Fetcher for: {law_id}")
-            relevant_articles = self._fetch_with_smart_fetcher(question, law_id, top_k)
+            logger.debug("Using Smart Fetcher for: %s", law_id)
+            relevant_articles = self._fetch_with_smart_fetcher(question, law_id, law, top_k)
         else:
             # Fallback to RAG
-            print("   Using RAG fallback")
-            relevant_articles = self.rag.search_relevant_articles(
-                query=question,
+            logger.debug("Using RAG fallback")
+            relevant_articles = self.search_cache.lookup_or_call(
+                question,
+                self.rag.search_relevant_articles,
                 top_k=top_k,
                 category=category
             )
         
+        # Formatting the hit list is only worth it when someone is reading debug logs
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Retrieved articles: %s",
+                ", ".join(f"{a.article_number} ({a.distance})" for a in relevant_articles)
+            )
+        
         if not relevant_articles:
             return {
                 'answer': "Atsiprašau, nepavyko rasti relevantišk ų įstatymų straipsnių šiam klausimui. Galbūt duomenų bazė dar neturi reikiamų įstatymų.",
@@ -103,21 +157,21 @@ class LegalAdvisor:
             }
         
         # Step 2: Build context from retrieved articles
-        print("STEP 2: Building legal context...\n")
+        logger.debug("STEP 2: Building legal context...")
         context = self._build_context(relevant_articles)
         
         # Step 3: Generate answer with Gemini
-        print("STEP 3: Generating AI-powered answer...\n")
+        logger.debug("STEP 3: Generating AI-powered answer...")
         prompt = self._build_prompt(question, context, relevant_articles)
         
         try:
             response = self.model.generate_content(prompt)
             answer = response.text
         except Exception as e:
-            print(f"❌ Gemini API Error: {e}")
+            logger.error("Gemini API Error: %s", e)
             return {
                 'answer': f"Klaida generuojant atsakymą: {str(e)}",
-                'sources': relevant_articles,
+                'sources': msgspec.to_builtins(relevant_articles),
                 'confidence': 'error',
                 'category': category or 'unknown'
             }
@@ -125,42 +179,66 @@ class LegalAdvisor:
         # Step 4: Calculate confidence based on article relevance
         confidence = self._calculate_confidence(relevant_articles)
         
-        print("="*70)
-        print("✅ ANSWER GENERATED")
-        print("="*70)
+        logger.info("Answer generated")
         
-        return {
+        result = {
             'answer': answer,
-            'sources': relevant_articles,
+            'sources': msgspec.to_builtins(relevant_articles),
             'confidence': confidence,
             'category': category or self._detect_category(relevant_articles)
         }
+        
+        self.answer_cache[cache_key] = result
+        if len(self.answer_cache) > self.ANSWER_CACHE_SIZE:
+            self.answer_cache.popitem(last=False)
+        
+        return result
     
-    def _build_context(self, articles: List[Dict]) -> str:
+    def _answer_cache_key(
+        self,
+        question: str,
+        category: Optional[str],
+        top_k: int,
+        law: Optional[Dict]
+    ) -> str:
+        """
+        Build answer cache key from the question, its parameters and the version
+        of the sources it is answered from
+        
+        Smart Fetcher answers are keyed by the fetched law's version (a re-fetch
+        changes it), RAG answers by the corpus version stamped at index time.
+        """
+        if law:
+            corpus_version = f"law:{law.get('version') or law.get('fetched_at')}"
+        else:
+            corpus_version = f"rag:{self._rag_version}"
+        raw = f"{question.strip().lower()}|{category or ''}|{top_k}|{corpus_version}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def invalidate(self):
+        """Drop cached answers and searches (done automatically when the RAG corpus changes)"""
+        self.answer_cache.clear()
+        self.search_cache.clear()
+    
+    def _build_context(self, articles: List[ArticleHit]) -> str:
         """Build formatted legal context from retrieved articles"""
         context_parts = []
+        template = self.CONTEXT_TEMPLATE
         
         for i, article in enumerate(articles, 1):
-            context_parts.append(
-                f"[{i}] {article['law_title']}\n"
-                f"    Straipsnis {article['article_number']}: {article['article_title']}\n"
-                f"    {article['content']}\n"
-            )
+            context_parts.append(template.format(
+                index=i,
+                law_title=article.law_title,
+                article_number=article.article_number,
+                article_title=article.article_title,
+                content=article.content
+            ))
         
         return "\n".join(context_parts)
     
-    def _build_prompt(self, question: str, context: str, articles: List[Dict]) -> str:
-        """Build the prompt for Gemini"""
-        return f"""Tu esi Lietuvos teisės ekspertas. Tavo užduotis - atsakyti į klausimą remiantis pateiktais įstatymų straipsniais.
-
-SVARBU:
-- Atsakyk TIKTAI remiantis pateiktais straipsniais
-- Nurodyk konkrečius straipsnius, kuriais remiesi
-- Jei straipsniai nepakankami atsakymui - pasakyk tai
-- Atsakymas turi būti aiškus ir suprantamas ne teisininkui
-- Naudok lietuvių kalbą
-
-RELEVANTIŠKI ĮSTATYMŲ STRAIPSNIAI:
+    def _build_prompt(self, question: str, context: str, articles: List[ArticleHit]) -> str:
+        """Build the per-question part of the prompt (instructions live in SYSTEM_INSTRUCTION)"""
+        return f"""RELEVANTIŠKI ĮSTATYMŲ STRAIPSNIAI:
 {context}
 
 KLAUSIMAS:
@@ -168,7 +246,7 @@ KLAUSIMAS:
 
 ATSAKYMAS (su nuorodomis į straipsnius):"""
     
-    def _calculate_confidence(self, articles: List[Dict]) -> str:
+    def _calculate_confidence(self, articles: List[ArticleHit]) -> str:
         """
         Calculate confidence level based on article relevance scores
         
@@ -178,7 +256,9 @@ ATSAKYMAS (su nuorodomis į straipsnius):"""
             return 'low'
         
         # Check distance scores (lower is better in cosine distance)
-        avg_distance = sum(a.get('distance', 1.0) for a in articles) / len(articles)
+        avg_distance = fmean(
+            a.distance if a.distance is not None else 1.0 for a in articles
+        )
         
         if avg_distance < 0.3:
             return 'high'
@@ -187,14 +267,17 @@ ATSAKYMAS (su nuorodomis į straipsnius):"""
         else:
             return 'low'
     
-    def _detect_category(self, articles: List[Dict]) -> str:
+    def _detect_category(self, articles: List[ArticleHit]) -> str:
         """Detect the most common category from retrieved articles"""
         if not articles:
             return 'unknown'
         
-        categories = [a['metadata'].get('category', 'unknown') for a in articles]
+        if len(articles) == 1:
+            return articles[0].metadata.get('category', 'unknown')
+        
         # Return most common category
-        return max(set(categories), key=categories.count)
+        categories = Counter(a.metadata.get('category', 'unknown') for a in articles)
+        return categories.most_common(1)[0][0]
     
     def _detect_law_from_question(self, question: str, category: Optional[str]) -> Optional[str]:
         """
@@ -215,19 +298,31 @@ ATSAKYMAS (su nuorodomis į straipsnius):"""
         
         return None
     
-    def _fetch_with_smart_fetcher(self, question: str, law_id: str, top_k: int) -> List[Dict]:
+    def _get_fetcher_law(self, law_id: str) -> Optional[Dict]:
+        """Get a law through Smart Fetcher (fetched and cached on first use)"""
+        try:
+            return self.fetcher.get_law(law_id)
+        except Exception as e:
+            logger.warning("Smart Fetcher error: %s", e)
+            return None
+    
+    def _fetch_with_smart_fetcher(
+        self,
+        question: str,
+        law_id: str,
+        law: Optional[Dict],
+        top_k: int
+    ) -> List[ArticleHit]:
         """
         Fetch relevant articles using Smart Fetcher
         
         Returns:
-            List of article dicts in RAG format
+            List of articles in RAG format
         """
+        if not law:
+            return []
+        
         try:
-            # Ensure law is cached
-            law = self.fetcher.get_law(law_id)
-            if not law:
-                return []
-            
             # Search articles
             articles = self.fetcher.search_articles(
                 query=question,
@@ -238,18 +333,18 @@ ATSAKYMAS (su nuorodomis į straipsnius):"""
             # Convert to RAG format
             rag_format = []
             for article in articles:
-                rag_format.append({
-                    'law_title': law['title'],
-                    'article_number': article['number'],
-                    'article_title': article['title'],
-                    'content': article['content'],
-                    'metadata': {'category': 'darbo_teisė', 'law_id': law_id},
-                    'distance': 0.3  # Placeholder
-                })
+                rag_format.append(ArticleHit(
+                    law_title=law['title'],
+                    article_number=article['number'],
+                    article_title=article['title'],
+                    content=article['content'],
+                    metadata={'category': 'darbo_teisė', 'law_id': law_id},
+                    distance=0.3  # Placeholder
+                ))
             
             return rag_format
         except Exception as e:
-            print(f"⚠️ Smart Fetcher error: {e}")
+            logger.warning("Smart Fetcher error: %s", e)
             return []
     
     def get_stats(self) -> Dict:
@@ -259,7 +354,8 @@ ATSAKYMAS (su nuorodomis į straipsnius):"""
         
         return {
             **rag_stats,
-            'cache_stats': fetcher_stats
+            'cache_stats': fetcher_stats,
+            'semantic_cache_stats': self.search_cache.get_stats()
         }
 
 
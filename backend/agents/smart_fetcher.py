@@ -5,8 +5,15 @@ Intelligently fetches laws from e-TAR with caching
 
 import sys
 import os
+import hashlib
+import logging
+import math
 import re
-from typing import Dict, Optional, List
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, List, Tuple
+
+import numpy as np
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -14,25 +21,64 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from backend.cache.cache_manager import CacheManager
 from backend.scrapers.etar_scraper import ETARScraper
 
+logger = logging.getLogger(__name__)
+
+# RE2 scans in linear time regardless of text size; fall back to stdlib re if not installed
+try:
+    import re2 as re_engine
+except ImportError:
+    import re as re_engine
+
+# Every article heading starts a line with this word
+ARTICLE_SENTINEL = 'Straipsnis'
+
+# Pattern: "Straipsnis 123. Title\nContent"
+# RE2 has no lookahead, so headings and content terminators are matched separately:
+# content runs until the next heading or the first blank line.
+# RE2's \s is ASCII-only - the no-break space (common in e-TAR text) is listed explicitly
+ARTICLE_HEADING_PATTERN = re_engine.compile(r'(?m)^Straipsnis[\s\xa0]+(\d+(?:\.\d+)?)\.[\s\xa0]+([^\n]+)\n')
+ARTICLE_END_PATTERN = re_engine.compile(r'\n(?:Straipsnis[\s\xa0]+\d|\n|$)')
+
+# Word tokens for relevance scoring (stdlib re: RE2's \w is ASCII-only and would split "sutartį")
+WORD_PATTERN = re.compile(r'\w+')
+
 
 class SmartLegalFetcher:
     """
     Intelligent agent that fetches laws from e-TAR with smart caching
     """
 
-    # Known laws mapping (name -> TAIS ID)
+    # Known laws mapping (normalized name -> TAIS ID)
     KNOWN_LAWS = {
-        'darbo_kodeksas': 'TAIS.245495',
         'darbo kodeksas': 'TAIS.245495',
-        'dk': 'TAIS.245495',
         # Add more as needed
     }
 
+    # Short names (normalized alias -> normalized name in KNOWN_LAWS)
+    LAW_ALIASES = {
+        'dk': 'darbo kodeksas',
+    }
+
+    # BM25 parameters (term frequency saturation, length normalization)
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+
+    # Articles known to be absent from a law are not looked up again for 5 minutes
+    ARTICLE_MISS_TTL = 300
+    ARTICLE_MISS_CACHE_SIZE = 1024
+
     def __init__(self):
         """Initialize Smart Legal Fetcher"""
         self.cache = CacheManager()
         self.scraper = ETARScraper()
-        print("[OK] Smart Legal Fetcher initialized")
+
+        # Parsed articles + BM25 stats per law: law_id -> (text hash, articles, idf, avgdl)
+        self._parsed_cache: Dict[str, Tuple[str, List[Dict], Dict[str, float], float]] = {}
+
+        # Negative cache: (law_id, article_number) -> expires_at
+        self._article_misses: OrderedDict[Tuple[str, str], float] = OrderedDict()
+
+        logger.info("Smart Legal Fetcher initialized")
 
     def get_law(
         self,
@@ -52,26 +98,26 @@ class SmartLegalFetcher:
         # Resolve law ID
         law_id = self._resolve_law_id(law_identifier)
         if not law_id:
-            print(f"❌ Unknown law: {law_identifier}")
+            logger.warning("Unknown law: %s", law_identifier)
             return None
 
         # Check cache first (unless force refresh)
         if not force_refresh:
             cached = self.cache.get_law(law_id)
             if cached:
-                print(f"✅ Cache HIT: {law_id}")
+                logger.debug("Cache HIT: %s", law_id)
                 return cached
 
         # Cache miss - fetch from e-TAR
-        print(f"🔍 Cache MISS: Fetching {law_id} from e-TAR...")
-        law_data = self.scraper.fetch_law_by_id(law_id)
+        logger.info("Cache MISS: fetching %s from e-TAR", law_id)
+        law_data = self.scraper.fetch_law_by_id(law_id, force_refresh=force_refresh)
 
         if not law_data:
-            print(f"❌ Failed to fetch law from e-TAR: {law_id}")
+            logger.error("Failed to fetch law from e-TAR: %s", law_id)
             return None
 
         # Parse articles
-        articles = self._parse_articles(law_data['full_text'])
+        articles, _, _ = self._parse_articles_cached(law_id, law_data['full_text'])
 
         # Cache the law
         self.cache.cache_law(
@@ -96,6 +142,9 @@ class SmartLegalFetcher:
             ]
             self.cache.cache_articles_batch(articles_to_cache)
 
+        # Fresh text may contain articles that were missing before
+        self._forget_article_misses(law_id)
+
         return law_data
 
     def get_article(
@@ -120,16 +169,37 @@ class SmartLegalFetcher:
         # Try cache first
         cached = self.cache.get_article(law_id, article_number)
         if cached:
-            print(f"✅ Article cache HIT: {law_id} - {article_number}")
+            logger.debug("Article cache HIT: %s - %s", law_id, article_number)
             return cached
 
-        # Not in cache - fetch full law
+        miss_key = (law_id, article_number)
+        miss_expires = self._article_misses.get(miss_key)
+        if miss_expires and miss_expires > time.time():
+            return None
+
+        # Not in article cache - use the cached law if fresh, fetch from e-TAR only if not
         law = self.get_law(law_id)
         if not law:
             return None
 
-        # Try cache again (should be there now)
-        return self.cache.get_article(law_id, article_number)
+        # Articles of a freshly fetched law were just cached
+        cached = self.cache.get_article(law_id, article_number)
+        if cached:
+            return cached
+
+        # Law came from the law cache but its articles were not cached - use the memoized parse
+        articles, _, _ = self._parse_articles_cached(law_id, law['full_text'])
+        for article in articles:
+            if article['number'] == article_number:
+                self.cache.cache_article(law_id, article_number, article['title'], article['content'])
+                return self.cache.get_article(law_id, article_number)
+
+        # The law has no such article - remember that instead of re-checking on every request
+        self._article_misses[miss_key] = time.time() + self.ARTICLE_MISS_TTL
+        self._article_misses.move_to_end(miss_key)
+        if len(self._article_misses) > self.ARTICLE_MISS_CACHE_SIZE:
+            self._article_misses.popitem(last=False)
+        return None
 
     def search_articles(
         self,
@@ -154,16 +224,23 @@ class SmartLegalFetcher:
             if not law:
                 return []
 
-            articles = self._parse_articles(law['full_text'])
-            # Simple relevance scoring
-            scored = []
-            for article in articles:
-                score = self._calculate_relevance(query, article)
-                if score > 0:
-                    scored.append((score, article))
+            law_id = self._resolve_law_id(law_identifier)
+            articles, idf, avgdl = self._parse_articles_cached(law_id, law['full_text'])
+            query_words = self._tokenize(query)
+            # BM25 relevance scoring
+            scores = np.fromiter(
+                (self._calculate_relevance(query_words, article, idf, avgdl) for article in articles),
+                dtype=np.float32,
+                count=len(articles)
+            )
+            if not len(scores) or top_k <= 0:
+                return []
 
-            scored.sort(reverse=True, key=lambda x: x[0])
-            return [article for _, article in scored[:top_k]]
+            # Partition out the top_k in O(N), then sort only those
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [articles[i] for i in top if scores[i] > 0]
 
         # TODO: Search across all cached laws
         return []
@@ -182,9 +259,35 @@ class SmartLegalFetcher:
         if identifier.startswith('TAIS.'):
             return identifier
 
-        # Try known laws
-        identifier_lower = identifier.lower().strip()
-        return self.KNOWN_LAWS.get(identifier_lower)
+        # Try known laws ("Darbo_kodeksas", "darbo kodeksas" and "DK" resolve alike)
+        name = identifier.strip().lower().replace('_', ' ')
+        name = self.LAW_ALIASES.get(name, name)
+        return self.KNOWN_LAWS.get(name)
+
+    def _parse_articles_cached(
+        self,
+        law_id: str,
+        full_text: str
+    ) -> Tuple[List[Dict], Dict[str, float], float]:
+        """
+        Parse law text into articles, reusing the previous parse if the text is unchanged
+
+        Args:
+            law_id: TAIS ID of the law
+            full_text: Full text of the law
+
+        Returns:
+            (articles, idf, avgdl) - see _parse_articles and _bm25_stats
+        """
+        text_hash = hashlib.sha1(full_text.encode('utf-8')).hexdigest()
+        cached = self._parsed_cache.get(law_id)
+        if cached and cached[0] == text_hash:
+            return cached[1:]
+
+        articles = self._parse_articles(full_text)
+        idf, avgdl = self._bm25_stats(articles)
+        self._parsed_cache[law_id] = (text_hash, articles, idf, avgdl)
+        return articles, idf, avgdl
 
     def _parse_articles(self, full_text: str) -> List[Dict]:
         """
@@ -198,57 +301,126 @@ class SmartLegalFetcher:
         """
         articles = []
 
-        # Pattern: "Straipsnis 123. Title\nContent"
-        # More flexible pattern to handle various formats
-        pattern = r'(?:^|\n)Straipsnis\s+(\d+(?:\.\d+)?)\.\s+([^\n]+)\n(.*?)(?=\n(?:Straipsnis\s+\d+|$))'
-
-        matches = re.finditer(pattern, full_text, re.DOTALL | re.MULTILINE)
-
-        for match in matches:
+        pos = 0
+        while True:
+            # Jump between "Straipsnis" line starts with str.find and only run the
+            # regex anchored there, instead of scanning the whole text with it
+            if pos == 0 and full_text.startswith(ARTICLE_SENTINEL):
+                start = 0
+            else:
+                start = full_text.find('\n' + ARTICLE_SENTINEL, max(pos - 1, 0))
+                if start < 0:
+                    break
+                start += 1
+
+            heading = ARTICLE_HEADING_PATTERN.match(full_text, start)
+            if not heading:
+                pos = start + 1
+                continue
+
+            end = ARTICLE_END_PATTERN.search(full_text, heading.end())
+            if not end:
+                break
+
+            title = heading.group(2).strip()
+            content = full_text[heading.end():end.start()].strip()
+            tokens = self._tokenize(f"{title} {content}")
             articles.append({
-                'number': match.group(1),
-                'title': match.group(2).strip(),
-                'content': match.group(3).strip()
+                'number': heading.group(1),
+                'title': title,
+                'content': content,
+                # Tokenized once here so scoring is a dict lookup per query word
+                '_term_freqs': Counter(tokens),
+                '_length': len(tokens)
             })
+            pos = end.start()
 
         if not articles:
-            print(f"⚠️ No articles parsed from text (length: {len(full_text)})")
+            logger.warning("No articles parsed from text (length: %d)", len(full_text))
 
         return articles
 
-    def _calculate_relevance(self, query: str, article: Dict) -> float:
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Split text into lowercase word tokens"""
+        return WORD_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def _bm25_stats(articles: List[Dict]) -> Tuple[Dict[str, float], float]:
         """
-        Simple relevance scoring
+        Compute BM25 corpus statistics over the articles of one law
 
         Args:
-            query: Search query
-            article: Article dict
+            articles: Article dicts from _parse_articles
 
         Returns:
-            Relevance score (0-1)
+            (idf per term, average article length in tokens)
+        """
+        doc_freqs = Counter()
+        for article in articles:
+            doc_freqs.update(article['_term_freqs'].keys())
+
+        n = len(articles)
+        idf = {
+            term: math.log((n - df + 0.5) / (df + 0.5) + 1)
+            for term, df in doc_freqs.items()
+        }
+        avgdl = sum(article['_length'] for article in articles) / n if n else 0.0
+        return idf, avgdl
+
+    def _calculate_relevance(
+        self,
+        query_words: List[str],
+        article: Dict,
+        idf: Dict[str, float],
+        avgdl: float
+    ) -> float:
         """
-        query_lower = query.lower()
-        text = f"{article['title']} {article['content']}".lower()
+        BM25 relevance score - rare terms weigh more than common ones like "darbo"
 
-        # Count query word matches
-        query_words = query_lower.split()
-        matches = sum(1 for word in query_words if word in text)
+        Args:
+            query_words: Tokenized search query
+            article: Article dict from _parse_articles
+            idf: Inverse document frequencies from _bm25_stats
+            avgdl: Average article length from _bm25_stats
 
-        return matches / len(query_words) if query_words else 0
+        Returns:
+            Relevance score (0 if no query word occurs in the article)
+        """
+        term_freqs = article['_term_freqs']
+        if not avgdl:
+            return 0.0
+        length_norm = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * article['_length'] / avgdl)
+
+        score = 0.0
+        for word in query_words:
+            tf = term_freqs.get(word)
+            if tf:
+                score += idf[word] * tf * (self.BM25_K1 + 1) / (tf + length_norm)
+        return score
 
     def get_stats(self) -> Dict:
         """Get cache statistics"""
         return self.cache.get_stats()
 
+    def _forget_article_misses(self, law_id: str):
+        """Drop negative cache entries of a law (its text changed)"""
+        for key in [key for key in self._article_misses if key[0] == law_id]:
+            del self._article_misses[key]
+
     def invalidate_law(self, law_identifier: str):
         """Invalidate cached law"""
         law_id = self._resolve_law_id(law_identifier)
         if law_id:
             self.cache.invalidate_law(law_id)
+            self._parsed_cache.pop(law_id, None)
+            self._forget_article_misses(law_id)
 
 
 # Test code
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+
     print("\n" + "="*70)
     print("🧪 SMART LEGAL FETCHER TEST")
     print("="*70 + "\n")
@@ -1,13 +1,19 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
 from backend import models
 from backend.database import get_db
+import asyncio
+import hashlib
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,12 +22,26 @@ SECRET_KEY = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
+# Validated tokens: sha256(token) -> (expires_at, detached User snapshot)
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 10_000
+_token_cache: "OrderedDict[bytes, Tuple[float, models.User]]" = OrderedDict()
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+# bcrypt is deliberately slow (~100ms) - give it its own CPU-sized pool so a burst of
+# logins can't occupy the shared threadpool that sync endpoints and DB calls run on
+_bcrypt_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password on the dedicated bcrypt pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
+
 def get_password_hash(password):
     # Bcrypt has a 72-byte limit, so we need to truncate if necessary
     # Convert to bytes to check length properly
@@ -40,12 +60,49 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _cache_user(key: bytes, user: models.User, token_exp: Optional[float]):
+    """Remember a validated token's user, never past the token's own expiry"""
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+
+    # Detached copy of the row: safe to merge into any later request's session
+    snapshot = models.User(
+        id=user.id,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        created_at=user.created_at
+    )
+    make_transient_to_detached(snapshot)
+
+    _token_cache[key] = (expires_at, snapshot)
+    _token_cache.move_to_end(key)
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+
+def invalidate_token(token: str):
+    """Drop a token from the validation cache (e.g., on logout)"""
+    _token_cache.pop(_token_key(token), None)
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):  # noqa: B008
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    # Recently validated token - skip JWT verification and the user query
+    key = _token_key(token)
+    cached = _token_cache.get(key)
+    if cached:
+        if cached[0] > time.time():
+            _token_cache.move_to_end(key)
+            return db.merge(cached[1], load=False)
+        del _token_cache[key]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -54,7 +111,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception from None
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    # Blocking query - keep it off the event loop
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == email).first()
+    )
     if user is None:
         raise credentials_exception
+
+    _cache_user(key, user, payload.get("exp"))
     return user
@@ -4,17 +4,32 @@ Manages SQLite cache for laws and articles
 """
 
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple
 import json
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class CacheManager:
     """
     Manages SQLite cache for legal documents
+
+    Hot laws/articles are also kept in a small in-memory LRU (L1) in front of SQLite (L2).
     """
 
+    # In-memory layer: entries per cache and seconds before re-reading SQLite
+    MEMORY_CACHE_SIZE = 64
+    MEMORY_CACHE_TTL = 3600
+
+    # Rows per multi-row INSERT (4 params per row, SQLite's conservative 999-parameter limit)
+    ARTICLE_INSERT_ROWS = 999 // 4
+
     def __init__(self, db_path: str = "data/legal_cache.db"):
         """
         Initialize cache manager
@@ -24,8 +39,19 @@ class CacheManager:
         """
         self.db_path = db_path
         self._ensure_data_dir()
+
+        # One long-lived connection instead of connect/close per query.
+        # Autocommit mode (isolation_level=None) - writes open explicit transactions.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self._configure_connection()
+
+        # key -> (expires_at, value); guarded by self.lock
+        self._memory_laws: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+        self._memory_articles: OrderedDict[Tuple[str, str], Tuple[float, Dict]] = OrderedDict()
+
         self._init_db()
-        print(f"[OK] Cache Manager initialized: {db_path}")
+        logger.info("Cache Manager initialized: %s", db_path)
 
     def _ensure_data_dir(self):
         """Ensure data directory exists"""
@@ -33,6 +59,56 @@ class CacheManager:
         if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir)
 
+    def _configure_connection(self):
+        """Apply connection pragmas (WAL lets readers run alongside a writer; the cache is read-mostly)"""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-131072")  # 128 MB
+        # Cache hits are served from a memory-mapped file instead of read() syscalls
+        self.conn.execute("PRAGMA mmap_size=536870912")  # 512 MB
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        """
+        Run statements in a single write transaction on the shared connection
+
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE) for bulk writes
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _memory_get(self, cache: OrderedDict, key, now: int) -> Optional[Dict]:
+        """Look up a fresh in-memory entry (caller holds self.lock)"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+    def _memory_put(self, cache: OrderedDict, key, value: Dict, now: int, expires_at: int = None):
+        """Store an in-memory entry, evicting the least recently used (caller holds self.lock)"""
+        ttl_expiry = now + self.MEMORY_CACHE_TTL
+        cache[key] = (min(expires_at, ttl_expiry) if expires_at else ttl_expiry, value)
+        cache.move_to_end(key)
+        if len(cache) > self.MEMORY_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
     def _init_db(self):
         """Initialize database schema"""
         schema_path = os.path.join(
@@ -41,47 +117,65 @@ class CacheManager:
         )
 
         if not os.path.exists(schema_path):
-            print(f"⚠️ Schema file not found: {schema_path}")
+            logger.warning("Schema file not found: %s", schema_path)
             return
 
-        conn = sqlite3.connect(self.db_path)
         with open(schema_path, 'r', encoding='utf-8') as f:
-            conn.executescript(f.read())
-        conn.commit()
-        conn.close()
-
-    def get_law(self, law_id: str) -> Optional[Dict]:
+            schema = f.read()
+        with self.lock:
+            self.conn.executescript(schema)
+            # One-time migration: expires_at used to be stored as an ISO string
+            self.conn.execute("""
+                UPDATE law_cache
+                SET expires_at = CAST(strftime('%s', expires_at) AS INTEGER)
+                WHERE typeof(expires_at) = 'text'
+            """)
+
+    def get_law(self, law_id: str, include_metadata: bool = False) -> Optional[Dict]:
         """
         Get cached law if fresh
 
         Args:
             law_id: TAIS ID of the law
+            include_metadata: Parse the metadata JSON into a 'metadata' dict
+                (otherwise only the raw 'metadata_raw' string is returned)
 
         Returns:
             Law data if cached and fresh, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT title, full_text, version, fetched_at, metadata
-            FROM law_cache
-            WHERE law_id = ? AND expires_at > datetime('now')
-        """, (law_id,))
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            return {
+        # Current time is read once and bound as a parameter (no datetime('now') in SQLite)
+        now = int(time.time())
+        with self.lock:
+            law = self._memory_get(self._memory_laws, law_id, now)
+            if law:
+                return self._with_metadata(law) if include_metadata else law
+
+            row = self.conn.execute("""
+                SELECT title, full_text, version, fetched_at, metadata, expires_at
+                FROM law_cache
+                WHERE law_id = ? AND expires_at > ?
+            """, (law_id, now)).fetchone()
+
+            if not row:
+                return None
+
+            law = {
                 'law_id': law_id,
                 'title': row[0],
                 'full_text': row[1],
                 'version': row[2],
                 'fetched_at': row[3],
-                'metadata': json.loads(row[4]) if row[4] else {}
+                'metadata_raw': row[4]
             }
-        return None
+            # Never keep a law in memory past its SQLite expiry
+            self._memory_put(self._memory_laws, law_id, law, now, row[5])
+            return self._with_metadata(law) if include_metadata else law
+
+    @staticmethod
+    def _with_metadata(law: Dict) -> Dict:
+        """Copy of a cached law with its metadata JSON parsed"""
+        raw = law['metadata_raw']
+        return {**law, 'metadata': json.loads(raw) if raw else {}}
 
     def cache_law(
         self,
@@ -103,24 +197,21 @@ class CacheManager:
             metadata: Additional metadata
             ttl_hours: Time to live in hours
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        expires_at = datetime.now() + timedelta(hours=ttl_hours)
-
-        cursor.execute("""
-            INSERT OR REPLACE INTO law_cache
-            (law_id, title, full_text, version, expires_at, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            law_id, title, full_text, version,
-            expires_at.isoformat(),
-            json.dumps(metadata or {})
-        ))
+        expires_at = int(time.time()) + ttl_hours * 3600
+
+        with self._transaction() as conn:
+            self._memory_laws.pop(law_id, None)
+            conn.execute("""
+                INSERT OR REPLACE INTO law_cache
+                (law_id, title, full_text, version, expires_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                law_id, title, full_text, version,
+                expires_at,
+                json.dumps(metadata or {})
+            ))
 
-        conn.commit()
-        conn.close()
-        print(f"✅ Cached law: {law_id} (expires in {ttl_hours}h)")
+        logger.debug("Cached law: %s (expires in %sh)", law_id, ttl_hours)
 
     def get_article(
         self,
@@ -137,26 +228,30 @@ class CacheManager:
         Returns:
             Article data if cached, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT article_title, content
-            FROM article_cache
-            WHERE law_id = ? AND article_number = ?
-        """, (law_id, article_number))
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            return {
+        key = (law_id, article_number)
+        now = int(time.time())
+        with self.lock:
+            article = self._memory_get(self._memory_articles, key, now)
+            if article:
+                return article
+
+            row = self.conn.execute("""
+                SELECT article_title, content
+                FROM article_cache
+                WHERE law_id = ? AND article_number = ?
+            """, key).fetchone()
+
+            if not row:
+                return None
+
+            article = {
                 'law_id': law_id,
                 'article_number': article_number,
                 'article_title': row[0],
                 'content': row[1]
             }
-        return None
+            self._memory_put(self._memory_articles, key, article, now)
+            return article
 
     def cache_article(
         self,
@@ -174,17 +269,13 @@ class CacheManager:
             article_title: Article title
             content: Article content
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT OR REPLACE INTO article_cache
-            (law_id, article_number, article_title, content)
-            VALUES (?, ?, ?, ?)
-        """, (law_id, article_number, article_title, content))
-
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            self._memory_articles.pop((law_id, article_number), None)
+            conn.execute("""
+                INSERT OR REPLACE INTO article_cache
+                (law_id, article_number, article_title, content)
+                VALUES (?, ?, ?, ?)
+            """, (law_id, article_number, article_title, content))
 
     def cache_articles_batch(self, articles: List[Dict]):
         """
@@ -193,24 +284,27 @@ class CacheManager:
         Args:
             articles: List of article dicts with law_id, article_number, article_title, content
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        for article in articles:
-            cursor.execute("""
-                INSERT OR REPLACE INTO article_cache
-                (law_id, article_number, article_title, content)
-                VALUES (?, ?, ?, ?)
-            """, (
-                article['law_id'],
-                article['article_number'],
-                article['article_title'],
-                article['content']
-            ))
-
-        conn.commit()
-        conn.close()
-        print(f"✅ Cached {len(articles)} articles")
+        # Multi-row VALUES inserts: ~250 articles per statement execution
+        with self._transaction(immediate=True) as conn:
+            for start in range(0, len(articles), self.ARTICLE_INSERT_ROWS):
+                chunk = articles[start:start + self.ARTICLE_INSERT_ROWS]
+                params = []
+                for article in chunk:
+                    self._memory_articles.pop((article['law_id'], article['article_number']), None)
+                    params.extend((
+                        article['law_id'],
+                        article['article_number'],
+                        article['article_title'],
+                        article['content']
+                    ))
+
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO article_cache
+                    (law_id, article_number, article_title, content)
+                    VALUES {", ".join(["(?, ?, ?, ?)"] * len(chunk))}
+                """, params)
+
+        logger.debug("Cached %d articles", len(articles))
 
     def invalidate_law(self, law_id: str):
         """
@@ -219,18 +313,15 @@ class CacheManager:
         Args:
             law_id: TAIS ID to invalidate
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._transaction() as conn:
+            self._memory_laws.pop(law_id, None)
+            conn.execute("""
+                UPDATE law_cache
+                SET expires_at = 0
+                WHERE law_id = ?
+            """, (law_id,))
 
-        cursor.execute("""
-            UPDATE law_cache
-            SET expires_at = datetime('now')
-            WHERE law_id = ?
-        """, (law_id,))
-
-        conn.commit()
-        conn.close()
-        print(f"🔄 Invalidated cache: {law_id}")
+        logger.info("Invalidated cache: %s", law_id)
 
     def get_stats(self) -> Dict:
         """
@@ -239,22 +330,14 @@ class CacheManager:
         Returns:
             Dict with cache stats
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT COUNT(*) FROM law_cache
-            WHERE expires_at > datetime('now')
-        """)
-        active_laws = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM law_cache")
-        total_laws = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM article_cache")
-        total_articles = cursor.fetchone()[0]
-
-        conn.close()
+        # One query with scalar subqueries instead of three round trips
+        with self.lock:
+            active_laws, total_laws, total_articles = self.conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM law_cache WHERE expires_at > ?),
+                    (SELECT COUNT(*) FROM law_cache),
+                    (SELECT COUNT(*) FROM article_cache)
+            """, (int(time.time()),)).fetchone()
 
         return {
             'active_laws': active_laws,
@@ -265,26 +348,22 @@ class CacheManager:
 
     def clear_expired(self):
         """Remove expired entries from cache"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            DELETE FROM law_cache
-            WHERE expires_at <= datetime('now')
-        """)
-
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            deleted = conn.execute("""
+                DELETE FROM law_cache
+                WHERE expires_at <= ?
+            """, (int(time.time()),)).rowcount
 
         if deleted > 0:
-            print(f"🧹 Cleared {deleted} expired laws from cache")
+            logger.info("Cleared %d expired laws from cache", deleted)
 
         return deleted
 
 
 # Test code
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+
     print("\n" + "="*70)
     print("🧪 CACHE MANAGER TEST")
     print("="*70 + "\n")
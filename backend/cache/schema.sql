@@ -7,7 +7,7 @@ CREATE TABLE IF NOT EXISTS law_cache (
     full_text TEXT NOT NULL,
     version TEXT NOT NULL,
     fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    expires_at TIMESTAMP,
+    expires_at INTEGER,  -- unix timestamp
     metadata TEXT  -- JSON string
 );
 
@@ -26,3 +26,7 @@ CREATE TABLE IF NOT EXISTS article_cache (
 CREATE INDEX IF NOT EXISTS idx_law_id ON article_cache(law_id);
 CREATE INDEX IF NOT EXISTS idx_article_number ON article_cache(article_number);
 CREATE INDEX IF NOT EXISTS idx_expires_at ON law_cache(expires_at);
+
+-- get_law looks laws up by the law_cache primary key (an extra law_id index is never used)
+DROP INDEX IF EXISTS idx_law_active;
+-- get_article lookups use the UNIQUE(law_id, article_number) index of article_cache
@@ -1,15 +1,44 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./teisinis_ai.db"
 
 # Create Engine
-# check_same_thread=False is needed for SQLite with FastAPI
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# QueuePool keeps connections open between requests (no reconnect per session)
+POOL_SETTINGS = {
+    "poolclass": QueuePool,
+    "pool_size": 20,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+}
+
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # check_same_thread=False is needed for SQLite with FastAPI
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **POOL_SETTINGS
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets request handlers read while another one writes"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    # Server databases drop idle connections - check before use and recycle periodically
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        **POOL_SETTINGS
+    )
+
 
 # Session Factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,23 +1,33 @@
-﻿import os
+﻿import asyncio
+import logging
+import os
 import sys
 import traceback
-from datetime import timedelta
-from typing import Optional
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request, status, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only, raiseload
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import RedirectResponse
 from authlib.integrations.starlette_client import OAuth
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Ensure project root is in path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -27,27 +37,84 @@ from backend.agents.document_generator import DocumentGenerator  # noqa: E402
 from backend.agents.eseimas_agent import ESeimasAgent  # noqa: E402
 from backend.agents.legal_advisor import LegalAdvisor  # noqa: E402
 from backend.agents.document_analyzer import DocumentAnalyzer  # noqa: E402
-from backend.database import Base, engine, get_db  # noqa: E402
-from backend.models import Document, User  # noqa: E402
+from backend.database import Base, SessionLocal, engine, get_db  # noqa: E402
+from backend.models import BatchJob, Document, User  # noqa: E402
 from backend.scrapers.etar_scraper import ETARScraper  # noqa: E402
-from backend.middleware.rate_limiter import rate_limit_middleware  # noqa: E402
+from backend.scrapers.seimas_scraper import SeimasScraper  # noqa: E402
+from backend.middleware.rate_limiter import RateLimitMiddleware  # noqa: E402
+
+# Create Database Tables - normally done once by setup_db.py; set AUTO_CREATE_TABLES=1
+# to do it on startup instead (each worker then introspects the schema on boot)
+if os.getenv("AUTO_CREATE_TABLES") == "1":
+    Base.metadata.create_all(bind=engine)
+
+def configure_logging():
+    """
+    Send agent logs to stdout (container/uvicorn logs) and a rotating file;
+    LOG_LEVEL=DEBUG shows per-step details. Called on startup, not at import.
+    """
+    os.makedirs('data', exist_ok=True)
+    file_handler = RotatingFileHandler('data/teisinis_ai.log', maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8')
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+        handlers=[logging.StreamHandler(), file_handler]
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the lightweight agents once per worker and attach them to app.state.
+    Their constructors only read config, so a failure here is a misconfiguration
+    and aborts startup instead of surfacing as a 500 on every request.
+    """
+    configure_logging()
+
+    app.state.doc_generator = DocumentGenerator()
+    app.state.eseimas = ESeimasAgent()
+    app.state.scraper = ETARScraper()
+    # Opens its aiohttp session on first use; closed on shutdown below
+    app.state.seimas_scraper = SeimasScraper()
+    logger.info("DocumentGenerator, ESeimasAgent, ETARScraper initialized")
+
+    # Preload frequently used legal articles so the first complaint doesn't pay for them
+    try:
+        await app.state.doc_generator.warm_cache()
+    except Exception:
+        logger.exception("Cache warm-up failed")
 
-# Create Database Tables
-Base.metadata.create_all(bind=engine)
+    # Collects finished Gemini batch jobs (see analyze_contract with priority="batch")
+    batch_poller = asyncio.create_task(poll_batch_jobs())
+
+    yield
+
+    batch_poller.cancel()
+    await app.state.seimas_scraper.close()
 
 app = FastAPI(
     title="Teisinis AI API",
     description="Backend API for Lithuanian Legal AI Assistant",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson serializes large document lists far faster
 )
 
 # CORS Configuration
+# Explicit origins/methods/headers (a "*" origin with credentials makes Starlette echo
+# each request's Origin) and max_age so browsers cache preflights for a day.
+# CORS_ORIGINS is a comma-separated list; the frontend itself is served from this app.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], # Allow all for MVP, restrict in production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
+    max_age=86400,
 )
 
 # Global Exception Handler
@@ -71,7 +138,7 @@ app.add_middleware(
 )
 
 # Rate Limiting Middleware (15 requests per minute)
-app.middleware("http")(rate_limit_middleware)
+app.add_middleware(RateLimitMiddleware)
 
 # OAuth Configuration
 oauth = OAuth()
@@ -90,19 +157,32 @@ oauth.register(
 print(f"[OK] Loaded Google Client ID: {os.getenv('GOOGLE_CLIENT_ID')[:10]}... (Length: {len(os.getenv('GOOGLE_CLIENT_ID') or '')})")
 print(f"[OK] Loaded Google Client Secret: {os.getenv('GOOGLE_CLIENT_SECRET')[:5]}... (Length: {len(os.getenv('GOOGLE_CLIENT_SECRET') or '')})")
 
-# Initialize Agents
-try:
-    doc_generator = DocumentGenerator()
-    eseimas = ESeimasAgent()
-    scraper = ETARScraper()
-    legal_advisor = LegalAdvisor()
-    document_analyzer = DocumentAnalyzer()
-    print("[OK] Agents initialized successfully")
-except Exception as e:
-    print(f"[ERROR] Failed to initialize agents: {e}")
-    legal_advisor = None
-    document_analyzer = None
-    # We don't crash here to allow health check to work even if agents fail
+# Initialize RAG Agents
+# DocumentGenerator, ESeimasAgent and ETARScraper live on app.state (see lifespan).
+# The RAG agents are created on first use, so workers boot (and /health answers) without
+# loading embedding models. A getter returns None if its agent failed to initialize
+# (the next call tries again) - we don't crash here to allow health check to work
+# even if agents fail.
+def _lazy_agent(agent_class):
+    agent = None
+    lock = asyncio.Lock()
+
+    async def get_agent():
+        nonlocal agent
+        if agent is None:
+            async with lock:
+                if agent is None:
+                    try:
+                        # The constructor loads the embedding model - keep it off the event loop
+                        agent = await run_in_threadpool(agent_class)
+                        logger.info("%s initialized", agent_class.__name__)
+                    except Exception:
+                        logger.exception("Failed to initialize %s", agent_class.__name__)
+        return agent
+    return get_agent
+
+get_legal_advisor = _lazy_agent(LegalAdvisor)
+get_document_analyzer = _lazy_agent(DocumentAnalyzer)
 
 # --- Pydantic Models ---
 
@@ -135,6 +215,7 @@ class ContractAnalysisRequest(BaseModel):
     contract_text: str
     contract_type: str = "general"  # employment, real_estate, family, tax, general
     language: str = "lt"
+    priority: str = "interactive"  # interactive, batch (Gemini Batch Mode, up to 24h)
 
 class UserCreate(BaseModel):
     email: str
@@ -144,6 +225,16 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class DocumentOut(BaseModel):
+    """Document history row - only what the history view shows, read from ORM attributes"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: Optional[str] = None
+    doc_type: Optional[str] = None
+    content: Optional[str] = None
+    created_at: Optional[datetime] = None
+
 # --- Endpoints ---
 
 @app.get("/api/health")
@@ -193,12 +284,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):  # noqa: B008
         db_user = User(email=user.email, hashed_password=hashed_password)
         db.add(db_user)
         db.commit()
-        db.refresh(db_user)
 
-        # Generate access token
+        # Generate access token (the email is the input - no need to reload the expired row)
         access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = auth.create_access_token(
-            data={"sub": db_user.email}, expires_delta=access_token_expires
+            data={"sub": user.email}, expires_delta=access_token_expires
         )
         return {"access_token": access_token, "token_type": "bearer"}
     except HTTPException:
@@ -208,10 +298,15 @@ def register(user: UserCreate, db: Session = Depends(get_db)):  # noqa: B008
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}") from e
 
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Look up a user by email (sync - call via run_in_threadpool from async endpoints)"""
+    return db.query(User).filter(User.email == email).first()
+
 @app.post("/api/v1/auth/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):  # noqa: B008
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):  # noqa: B008
+    user = await run_in_threadpool(get_user_by_email, db, form_data.username)
+    # Google accounts have no password hash - reject without running bcrypt
+    if not user or not user.hashed_password or not await auth.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -254,19 +349,13 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
         if not email:
             raise HTTPException(status_code=400, detail="Google account has no email")
 
-        # Check if user exists
-        db_user = db.query(User).filter(User.email == email).first()
-        if not db_user:
-            # Create new user
-            db_user = User(email=email, hashed_password=None) # No password for Google users
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+        # Check if user exists, create if not (blocking DB work runs in the threadpool)
+        await run_in_threadpool(get_or_create_google_user, db, email)
 
         # Generate JWT
         access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = auth.create_access_token(
-            data={"sub": db_user.email}, expires_delta=access_token_expires
+            data={"sub": email}, expires_delta=access_token_expires
         )
 
         # Redirect to frontend with token
@@ -291,6 +380,23 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
             status_code=500,
             content={"error": "Google OAuth failed", "detail": detail}
         )
+def get_or_create_google_user(db: Session, email: str) -> User:
+    """Find a Google-authenticated user by email, creating the account on first login"""
+    db_user = db.query(User).filter(User.email == email).first()
+    if not db_user:
+        # Create new user
+        db_user = User(email=email, hashed_password=None) # No password for Google users
+        db.add(db_user)
+        db.commit()
+    return db_user
+
+def save_document(db: Session, **fields) -> Document:
+    """Insert a generated document (sync - call via run_in_threadpool from async endpoints)"""
+    db_doc = Document(**fields)
+    db.add(db_doc)
+    db.commit()
+    return db_doc
+
 @app.post("/api/v1/generate/complaint")
 async def generate_complaint(request: ComplaintRequest, db: Session = Depends(get_db), current_user: User = Depends(auth.get_current_user)):  # noqa: B008
     """
@@ -298,27 +404,68 @@ async def generate_complaint(request: ComplaintRequest, db: Session = Depends(ge
     """
     try:
         user_data = request.dict()
-        result = doc_generator.generate_labor_complaint(user_data)
+        result = await app.state.doc_generator.generate_labor_complaint(user_data)
 
         if not result:
             raise HTTPException(status_code=500, detail="Failed to generate document")
 
         # Save to Database
-        db_doc = Document(
+        await run_in_threadpool(
+            save_document,
+            db,
             title=f"Skundas: {user_data.get('employee_name', 'Darbuotojas')}",
             doc_type="complaint",
             content=result['content'],
             user_data=user_data,
             owner=current_user
         )
-        db.add(db_doc)
-        db.commit()
-        db.refresh(db_doc)
 
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+def save_streamed_document(chunks: list, **fields):
+    """Background task: store a streamed document once the client has received all of it"""
+    if not chunks:
+        return
+
+    db = SessionLocal()
+    try:
+        save_document(db, content="".join(chunks), **fields)
+    finally:
+        db.close()
+
+@app.post("/api/v1/generate/complaint/stream")
+async def generate_complaint_stream(request: ComplaintRequest, current_user: User = Depends(auth.get_current_user)):  # noqa: B008
+    """
+    Generate a labor complaint, streaming the text as it is generated.
+    The assembled document is saved to DB after the response completes.
+    """
+    doc_generator = app.state.doc_generator
+    if not hasattr(doc_generator, 'model'):
+        raise HTTPException(status_code=503, detail="Gemini model not initialized")
+
+    user_data = request.dict()
+    chunks = []
+
+    async def stream():
+        async for chunk in doc_generator.stream_labor_complaint(user_data):
+            chunks.append(chunk)
+            yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/plain; charset=utf-8",
+        background=BackgroundTask(
+            save_streamed_document,
+            chunks,
+            title=f"Skundas: {user_data.get('employee_name', 'Darbuotojas')}",
+            doc_type="complaint",
+            user_data=user_data,
+            user_id=current_user.id
+        )
+    )
+
 @app.post("/api/v1/generate/contract")
 async def generate_contract(request: ContractRequest, db: Session = Depends(get_db), current_user: User = Depends(auth.get_current_user)):  # noqa: B008
     """
@@ -326,33 +473,44 @@ async def generate_contract(request: ContractRequest, db: Session = Depends(get_
     """
     try:
         user_data = request.dict()
-        result = doc_generator.generate_employment_contract(user_data)
+        result = app.state.doc_generator.generate_employment_contract(user_data)
 
         if not result:
             raise HTTPException(status_code=500, detail="Failed to generate document")
 
         # Save to Database
-        db_doc = Document(
+        await run_in_threadpool(
+            save_document,
+            db,
             title=f"Darbo Sutartis: {user_data.get('employee_name')}",
             doc_type="contract",
             content=result['content'],
             user_data=user_data,
             owner=current_user
         )
-        db.add(db_doc)
-        db.commit()
-        db.refresh(db_doc)
 
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
-@app.get("/api/v1/documents")
+@app.get("/api/v1/documents", response_model=List[DocumentOut])
 def get_documents(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_user: User = Depends(auth.get_current_user)):  # noqa: B008
     """
     Get user's generated documents history.
     """
-    docs = db.query(Document).filter(Document.user_id == current_user.id).order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
+    # Load only the listed columns; touching doc.owner raises instead of issuing a SELECT per row
+    docs = (
+        db.query(Document)
+        .options(
+            load_only(Document.id, Document.title, Document.doc_type, Document.content, Document.created_at),
+            raiseload(Document.owner)
+        )
+        .filter(Document.user_id == current_user.id)
+        .order_by(Document.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
     return docs
 
 @app.get("/api/v1/legislation/updates")
@@ -361,7 +519,7 @@ async def get_updates(keyword: str = "Darbo kodeksas", days: int = 7):
     Get recent legislation updates.
     """
     try:
-        updates = eseimas.search_new_legislation(keyword, days)
+        updates = app.state.eseimas.search_new_legislation(keyword, days)
         return {"updates": updates}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -372,6 +530,7 @@ async def ask_legal_question(request: LegalQuestionRequest, current_user: User =
     Answer any legal question using RAG + AI
     """
     try:
+        legal_advisor = await get_legal_advisor()
         if not legal_advisor:
             raise HTTPException(status_code=503, detail="Legal Advisor not initialized")
 
@@ -391,6 +550,7 @@ async def get_legal_stats():
     Get statistics about the legal knowledge base
     """
     try:
+        legal_advisor = await get_legal_advisor()
         if not legal_advisor:
             raise HTTPException(status_code=503, detail="Legal Advisor not initialized")
 
@@ -399,16 +559,133 @@ async def get_legal_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+# Seconds between checks for finished Gemini batch jobs
+BATCH_POLL_INTERVAL = int(os.getenv("BATCH_POLL_INTERVAL", "60"))
+# Seconds after which a job stuck in "collecting" may be claimed again
+BATCH_CLAIM_TIMEOUT = 15 * 60
+
+def submit_batch_contract_analysis(document_analyzer: DocumentAnalyzer, contract: dict, user_id: int):
+    """
+    Submit a contract to Gemini Batch Mode and record the job so the poller can
+    collect it (sync - call via run_in_threadpool). Returns once the job is created.
+    """
+    job_name, relevant_laws = document_analyzer.submit_contracts_batch([contract])
+
+    db = SessionLocal()
+    try:
+        db.add(BatchJob(
+            job_name=job_name,
+            contract_id=contract['id'],
+            contract_type=contract['contract_type'],
+            relevant_laws=relevant_laws.get(contract['id'], []),
+            user_id=user_id
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def collect_batch_jobs():
+    """
+    Store the analyses of finished batch jobs in their owners' document history
+    (sync - runs in the threadpool). Jobs still running are left pending.
+    """
+    db = SessionLocal()
+    try:
+        # Claims older than BATCH_CLAIM_TIMEOUT belong to a poller that died mid-collection
+        now = datetime.utcnow()
+        collectable = or_(
+            BatchJob.status == "pending",
+            and_(
+                BatchJob.status == "collecting",
+                BatchJob.claimed_at < now - timedelta(seconds=BATCH_CLAIM_TIMEOUT)
+            )
+        )
+
+        jobs_by_name = {}
+        for job in db.query(BatchJob).filter(collectable).all():
+            jobs_by_name.setdefault(job.job_name, []).append(job)
+
+        for job_name, jobs in jobs_by_name.items():
+            # Claim the job first - every worker runs a poller
+            claimed = db.query(BatchJob).filter(
+                BatchJob.job_name == job_name,
+                collectable
+            ).update({"status": "collecting", "claimed_at": now}, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                continue
+
+            try:
+                _collect_batch_job(db, job_name, jobs)
+            except Exception:
+                logger.exception("Collecting batch job %s failed", job_name)
+                db.rollback()
+                # Hand the job back so the next poll retries it
+                db.query(BatchJob).filter(
+                    BatchJob.job_name == job_name,
+                    BatchJob.status == "collecting"
+                ).update({"status": "pending", "claimed_at": None}, synchronize_session=False)
+                db.commit()
+    finally:
+        db.close()
+
+def _collect_batch_job(db: Session, job_name: str, jobs: List[BatchJob]):
+    """Check one claimed batch job and save its analyses (or release it if still running)"""
+    results = DocumentAnalyzer.collect_contracts_batch(job_name, [
+        {'id': job.contract_id, 'contract_type': job.contract_type, 'relevant_laws': job.relevant_laws}
+        for job in jobs
+    ])
+
+    for job in jobs:
+        if results is None:
+            job.status = "pending"
+            job.claimed_at = None
+            continue
+
+        analysis = results.get(job.contract_id)
+        job.status = "done" if analysis else "failed"
+        if analysis:
+            db.add(Document(
+                title=f"Sutarties analizė: {job.contract_type}",
+                doc_type="contract_analysis",
+                content=analysis.get('summary', ''),
+                user_data=analysis,
+                user_id=job.user_id
+            ))
+    db.commit()
+
+async def poll_batch_jobs():
+    """Lifespan task: collect finished batch jobs every BATCH_POLL_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        try:
+            await run_in_threadpool(collect_batch_jobs)
+        except Exception:
+            logger.exception("Batch job polling failed")
+
 @app.post("/api/v1/legal/analyze-contract")
 async def analyze_contract(request: ContractAnalysisRequest, current_user: User = Depends(auth.get_current_user)):  # noqa: B008
     """
     Analyze a legal contract and identify risks, missing clauses, and provide recommendations
+
+    priority="batch" submits the analysis to Gemini Batch Mode (cheaper, slower) and
+    returns right away; the result is saved to the user's documents when ready.
     """
     try:
+        document_analyzer = await get_document_analyzer()
         if not document_analyzer:
             raise HTTPException(status_code=503, detail="Document Analyzer not initialized")
 
-        result = document_analyzer.analyze_contract(
+        if request.priority == "batch":
+            contract = {
+                'id': f"{current_user.id}_{uuid.uuid4().hex}",
+                'contract_text': request.contract_text,
+                'contract_type': request.contract_type
+            }
+            await run_in_threadpool(submit_batch_contract_analysis, document_analyzer, contract, current_user.id)
+            return {"status": "queued", "batch_id": contract['id']}
+
+        result = await document_analyzer.analyze_contract(
             contract_text=request.contract_text,
             contract_type=request.contract_type,
             language=request.language
@@ -424,27 +701,14 @@ async def get_article(article_id: int):
     Fetch specific article content.
     """
     try:
-        # Note: Scraper implementation needs to support fetch_article(int)
-        # Current mock supports checking fallbacks
-
-        # Temporary logic until scraper fetch_article is fully robust with args
-        # For MVP we mainly used fetch_darbo_kodeksas
-
-        # We'll try to use the scraper's analyze method if we had the text,
-        # but for now let's implement a simple lookup if the scraper has the method,
-        # or return a stub if not yet implemented in scraper class.
-
-        if hasattr(scraper, 'fetch_article'):
-             article = scraper.fetch_article(article_id)
-        else:
-             # Fallback implementation if scraper doesn't have fetch_article yet
-             # This is just for the API endpoint to verify connectivity
-             article = {"id": article_id, "content": "Article fetch logic pending in scraper update"}
-
-        if not article:
+        # Text download/extraction runs in a worker thread (and hits the article cache)
+        articles = await app.state.scraper.fetch_articles_async([article_id])
+        if not articles:
             raise HTTPException(status_code=404, detail="Article not found")
 
-        return article
+        return articles[0]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -497,13 +761,14 @@ async def upload_document(
             )
 
         # Analyze with Document Analyzer
+        document_analyzer = await get_document_analyzer()
         if not document_analyzer:
             raise HTTPException(
                 status_code=503,
                 detail="Document analyzer not initialized"
             )
 
-        result = document_analyzer.analyze_contract(
+        result = await document_analyzer.analyze_contract(
             contract_text=text,
             contract_type=analysis_type
         )
@@ -2,6 +2,6 @@
 Middleware package
 """
 
-from backend.middleware.rate_limiter import rate_limit_middleware, rate_limiter
+from backend.middleware.rate_limiter import RateLimitMiddleware, RateLimiter, login_rate_limiter, rate_limiter
 
-__all__ = ['rate_limit_middleware', 'rate_limiter']
+__all__ = ['RateLimitMiddleware', 'RateLimiter', 'login_rate_limiter', 'rate_limiter']
@@ -3,17 +3,18 @@ Rate Limiting Middleware
 Limits API requests to 15 per minute per user
 """
 
-from fastapi import Request, HTTPException
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Dict, List
-import asyncio
+from typing import Dict, Optional, Tuple
+import json
+import time
 
 
 class RateLimiter:
     """
     Rate limiting middleware for FastAPI
     Tracks requests per user and enforces limits
+
+    Uses fixed-window counters: one integer per (user:endpoint, window) instead of
+    a list of timestamps, so each check is O(1) and allocates nothing.
     """
 
     def __init__(self, max_requests: int = 15, window_seconds: int = 60):
@@ -26,106 +27,143 @@ class RateLimiter:
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, List[datetime]] = defaultdict(list)
-        self.lock = asyncio.Lock()
+        self.counters: Dict[Tuple[str, int], int] = {}
+        self.current_window = self._current_window()
+
+    def _current_window(self) -> int:
+        """Index of the current fixed time window"""
+        return int(time.monotonic()) // self.window_seconds
+
+    def _sweep(self, window: int):
+        """Drop counters of past windows (once per window, not per request)"""
+        if window != self.current_window:
+            self.current_window = window
+            self.counters = {
+                key: count for key, count in self.counters.items()
+                if key[1] >= window
+            }
 
-    async def check_rate_limit(self, user_id: str, endpoint: str) -> bool:
+    # No lock needed: the counter updates below never await, so they are atomic
+    # on the event loop
+    async def check_rate_limit(self, user_id: str, endpoint: str) -> Tuple[bool, int]:
         """
-        Check if user has exceeded rate limit
+        Check if user has exceeded rate limit, counting the request if allowed
 
         Args:
             user_id: User identifier
             endpoint: API endpoint path
 
         Returns:
-            True if request allowed, False if rate limit exceeded
+            (True if request allowed / False if rate limit exceeded,
+             remaining requests in current window)
         """
-        async with self.lock:
-            key = f"{user_id}:{endpoint}"
-            now = datetime.now()
+        window = self._current_window()
+        self._sweep(window)
 
-            # Remove old requests outside the time window
-            self.requests[key] = [
-                ts for ts in self.requests[key]
-                if now - ts < timedelta(seconds=self.window_seconds)
-            ]
+        key = (f"{user_id}:{endpoint}", window)
+        count = self.counters.get(key, 0)
 
-            # Check if limit exceeded
-            if len(self.requests[key]) >= self.max_requests:
-                return False
+        # Check if limit exceeded
+        if count >= self.max_requests:
+            return False, 0
 
-            # Add current request timestamp
-            self.requests[key].append(now)
-            return True
+        # Count current request
+        self.counters[key] = count + 1
+        return True, self.max_requests - count - 1
 
     async def get_remaining_requests(self, user_id: str, endpoint: str) -> int:
         """Get number of remaining requests in current window"""
-        async with self.lock:
-            key = f"{user_id}:{endpoint}"
-            now = datetime.now()
-
-            # Clean old requests
-            self.requests[key] = [
-                ts for ts in self.requests[key]
-                if now - ts < timedelta(seconds=self.window_seconds)
-            ]
-
-            return max(0, self.max_requests - len(self.requests[key]))
+        key = (f"{user_id}:{endpoint}", self._current_window())
+        return max(0, self.max_requests - self.counters.get(key, 0))
 
 
 # Global rate limiter instance
 rate_limiter = RateLimiter(max_requests=15, window_seconds=60)
 
+# Stricter limit for password login - every attempt costs a bcrypt hash
+login_rate_limiter = RateLimiter(max_requests=5, window_seconds=60)
 
-async def rate_limit_middleware(request: Request, call_next):
-    """
-    FastAPI middleware function for rate limiting
 
-    Args:
-        request: FastAPI request object
-        call_next: Next middleware/route handler
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting middleware
 
-    Returns:
-        Response or HTTPException if rate limit exceeded
+    Unlike an @app.middleware("http") function (wrapped in BaseHTTPMiddleware),
+    this does not build Request/Response objects or stream the response body
+    through a memory channel - it only wraps `send` to add the rate limit headers.
     """
-    # Skip rate limiting for certain endpoints
-    skip_paths = ["/health", "/docs", "/openapi.json", "/redoc"]
-    if request.url.path in skip_paths:
-        return await call_next(request)
-
-    # Get user ID from request state (set by auth middleware)
-    user_id = getattr(request.state, "user_id", None)
-
-    # If no user ID, use IP address as fallback
-    if not user_id:
-        client_host = request.client.host if request.client else "unknown"
-        user_id = f"ip:{client_host}"
-
-    endpoint = request.url.path
-
-    # Check rate limit
-    allowed = await rate_limiter.check_rate_limit(user_id, endpoint)
-
-    if not allowed:
-        # Get remaining time until window resets
-        remaining = await rate_limiter.get_remaining_requests(user_id, endpoint)
-
-        raise HTTPException(
-            status_code=429,
-            detail={
-                "error": "Rate limit exceeded",
-                "message": f"Maximum {rate_limiter.max_requests} requests per {rate_limiter.window_seconds} seconds",
-                "retry_after": rate_limiter.window_seconds,
-                "remaining": remaining
-            }
-        )
 
-    # Add rate limit headers to response
-    response = await call_next(request)
+    # Skip rate limiting for certain endpoints (set lookup) and static assets (prefix match)
+    SKIP_PATHS = frozenset({"/health", "/api/health", "/docs", "/openapi.json", "/redoc"})
+    SKIP_PREFIXES = ("/css/", "/js/")
 
-    remaining = await rate_limiter.get_remaining_requests(user_id, endpoint)
-    response.headers["X-RateLimit-Limit"] = str(rate_limiter.max_requests)
-    response.headers["X-RateLimit-Remaining"] = str(remaining)
-    response.headers["X-RateLimit-Reset"] = str(rate_limiter.window_seconds)
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter = rate_limiter,
+        path_limiters: Optional[Dict[str, RateLimiter]] = None
+    ):
+        """
+        Args:
+            app: Next ASGI application
+            limiter: Rate limiter to enforce
+            path_limiters: Limiters for specific paths, used instead of `limiter`
+        """
+        self.app = app
+        self.limiter = limiter
+        self.path_limiters = (
+            path_limiters if path_limiters is not None
+            else {"/api/v1/auth/token": login_rate_limiter}
+        )
 
-    return response
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in self.SKIP_PATHS or path.startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Get user ID from request state (set by auth middleware)
+        user_id = scope.get("state", {}).get("user_id")
+
+        # If no user ID, use IP address as fallback
+        if not user_id:
+            client_host = scope["client"][0] if scope.get("client") else "unknown"
+            user_id = f"ip:{client_host}"
+
+        limiter = self.path_limiters.get(path, self.limiter)
+
+        # Check rate limit (one pass also gives the remaining count for the headers)
+        allowed, remaining = await limiter.check_rate_limit(user_id, path)
+
+        if not allowed:
+            body = json.dumps({
+                "detail": {
+                    "error": "Rate limit exceeded",
+                    "message": f"Maximum {limiter.max_requests} requests per {limiter.window_seconds} seconds",
+                    "retry_after": limiter.window_seconds,
+                    "remaining": remaining
+                }
+            }).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(limiter.window_seconds).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Add rate limit headers to response
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-ratelimit-limit", str(limiter.max_requests).encode()),
+                    (b"x-ratelimit-remaining", str(remaining).encode()),
+                    (b"x-ratelimit-reset", str(limiter.window_seconds).encode())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from backend.database import Base
@@ -12,9 +12,12 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     documents = relationship("Document", back_populates="owner")
+    batch_jobs = relationship("BatchJob", back_populates="owner")
 
 class Document(Base):
     __tablename__ = "documents"
+    # Serves "a user's documents, newest first" as one index range scan (read backwards)
+    __table_args__ = (Index("ix_documents_user_created", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -28,3 +31,22 @@ class Document(Base):
 
     def __repr__(self):
         return f"<Document(id={self.id}, title='{self.title}')>"
+
+class BatchJob(Base):
+    """A contract analysis submitted to Gemini Batch Mode, waiting to be collected"""
+    __tablename__ = "batch_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String, index=True) # Gemini batch job name
+    contract_id = Column(String, unique=True, index=True)
+    contract_type = Column(String)
+    relevant_laws = Column(JSON) # Top RAG hits used in the prompt
+    status = Column(String, default="pending", index=True) # pending, collecting, done, failed
+    claimed_at = Column(DateTime, nullable=True) # When a poller started collecting it
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user_id = Column(Integer, ForeignKey("users.id"))
+    owner = relationship("User", back_populates="batch_jobs")
+
+    def __repr__(self):
+        return f"<BatchJob(id={self.id}, job_name='{self.job_name}', status='{self.status}')>"
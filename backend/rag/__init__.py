@@ -2,6 +2,7 @@
 RAG module for legal document retrieval
 """
 
-from .vector_store import LegalRAG
+from .vector_store import ArticleHit, LegalRAG, get_rag
+from .semantic_cache import SemanticCache
 
-__all__ = ['LegalRAG']
+__all__ = ['ArticleHit', 'LegalRAG', 'SemanticCache', 'get_rag']
@@ -0,0 +1,145 @@
+"""
+Semantic (approximate) cache for RAG searches
+Returns cached results when a new query is semantically close to a previous one
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-memory cache keyed by query embeddings instead of exact query strings
+
+    Legal questions are highly repetitive ("Kaip nutraukti darbo sutartį?"),
+    so a query within cosine similarity `threshold` of a cached one reuses
+    its results and skips the vector search entirely.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable,
+        capacity: int = 256,
+        threshold: float = 0.95
+    ):
+        """
+        Initialize semantic cache
+
+        Args:
+            embed_fn: Function mapping query text to an embedding vector
+            capacity: Maximum number of cached queries (LRU eviction)
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.embed_fn = embed_fn
+        self.capacity = capacity
+        self.threshold = threshold
+
+        # Keys are stored as one row-normalized matrix so a lookup is a single np.dot
+        self._keys: Optional[np.ndarray] = None
+        # Search params (top_k, category) interned to small ints, one per row of _keys
+        self._param_ids: Dict[Tuple, int] = {}
+        self._groups = np.empty(0, dtype=np.int32)
+        self._results: List[List[Dict]] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def lookup_or_call(self, query: str, search_fn: Callable, **kwargs) -> List[Dict]:
+        """
+        Return cached results for a similar query, or run the search and cache it
+
+        Args:
+            query: Search query
+            search_fn: Search function, called as search_fn(query=..., query_embedding=..., **kwargs)
+            **kwargs: Extra search parameters (top_k, category); part of the cache key
+
+        Returns:
+            Search results
+        """
+        embedding = np.asarray(self.embed_fn(query), dtype=np.float32)
+        params = tuple(sorted(kwargs.items()))
+
+        cached = self.lookup(embedding, params)
+        if cached is not None:
+            return cached
+
+        results = search_fn(query=query, query_embedding=embedding, **kwargs)
+        self.insert(embedding, params, results)
+        return results
+
+    def lookup(self, embedding: np.ndarray, params: Tuple = ()) -> Optional[List[Dict]]:
+        """Find cached results for the closest query with matching params"""
+        q = self._normalize(embedding)
+
+        with self.lock:
+            group = self._param_ids.get(params)
+            if self._keys is None or group is None:
+                self.misses += 1
+                return None
+
+            sims = np.dot(self._keys, q)
+            # Only entries searched with the same top_k / category are comparable
+            sims[self._groups != group] = -1.0
+
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._clock += 1
+            self._last_used[best] = self._clock
+            self.hits += 1
+            return self._results[best]
+
+    def insert(self, embedding: np.ndarray, params: Tuple, results: List[Dict]):
+        """Add query results to the cache, evicting the least recently used entry if full"""
+        q = self._normalize(embedding)
+
+        with self.lock:
+            self._clock += 1
+            group = self._param_ids.setdefault(params, len(self._param_ids))
+
+            if self._keys is not None and len(self._results) >= self.capacity:
+                lru = int(np.argmin(self._last_used))
+                self._keys[lru] = q
+                self._groups[lru] = group
+                self._results[lru] = results
+                self._last_used[lru] = self._clock
+                return
+
+            row = q[np.newaxis, :]
+            self._keys = row if self._keys is None else np.vstack([self._keys, row])
+            self._groups = np.append(self._groups, np.int32(group))
+            self._results.append(results)
+            self._last_used.append(self._clock)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self.lock:
+            self._keys = None
+            self._param_ids = {}
+            self._groups = np.empty(0, dtype=np.int32)
+            self._results = []
+            self._last_used = []
+
+    def get_stats(self) -> Dict:
+        """Get cache hit statistics"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._results),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
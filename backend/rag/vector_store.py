@@ -4,42 +4,135 @@ Manages semantic search across Lithuanian legal documents
 """
 
 import chromadb
+import msgspec
+import numpy as np
+from collections import OrderedDict
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
+import logging
 import os
+import threading
+import uuid
 
 
+# Multilingual sentence transformer - supports Lithuanian
+EMBEDDING_MODEL = 'paraphrase-multilingual-mpnet-base-v2'
+
+_EMBEDDER: Optional[SentenceTransformer] = None
+_EMBEDDER_LOCK = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def get_embedder() -> SentenceTransformer:
+    """
+    Get the process-wide embedding model, loading it on first use
+    
+    The model is ~1GB; every LegalRAG (API singleton, indexing scripts) shares one copy.
+    Set EMBEDDER_NUM_THREADS to cap torch CPU threads when running next to API workers,
+    and EMBEDDER_INT8=1 to run the CPU model with int8 dynamically quantized Linear layers.
+    """
+    global _EMBEDDER
+    with _EMBEDDER_LOCK:
+        if _EMBEDDER is None:
+            num_threads = os.getenv('EMBEDDER_NUM_THREADS')
+            if num_threads:
+                import torch
+                torch.set_num_threads(int(num_threads))
+            
+            print("⏳ Loading multilingual embedding model...")
+            embedder = SentenceTransformer(EMBEDDING_MODEL)
+            if embedder.device.type == 'cuda':
+                # Half precision halves memory traffic on GPU; CPU stays float32
+                embedder.half()
+            elif os.getenv('EMBEDDER_INT8') == '1':
+                # int8 weights, activations quantized on the fly: ~2-3x faster on CPU.
+                # Embeddings shift slightly - keep the index and queries on the same setting.
+                import torch
+                embedder = torch.quantization.quantize_dynamic(
+                    embedder, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            print("✅ Embedding model loaded")
+            _EMBEDDER = embedder
+    return _EMBEDDER
+
+
+class ArticleHit(msgspec.Struct, frozen=True):
+    """
+    One retrieved article (RAG or Smart Fetcher search result)
+    
+    Convert with msgspec.to_builtins() before returning it from an API endpoint.
+    """
+    law_title: str
+    article_number: str
+    article_title: str
+    content: str
+    metadata: dict
+    distance: Optional[float] = None
+    article_id: str = ''
+    content_preview: Optional[str] = None
+
 
 class LegalRAG:
     """
     Vector database for legal document retrieval using semantic search
     """
     
-    def __init__(self, persist_directory: str = "data/chroma_db"):
+    # Length of the article preview stored alongside each embedding
+    PREVIEW_CHARS = 300
+    
+    # Indexing: articles per encoder forward pass / per ChromaDB add() request
+    ENCODE_BATCH_SIZE = 64
+    ADD_BATCH_SIZE = 500
+    
+    # Embeddings of recent query strings (LRU) - skips the transformer forward pass
+    QUERY_CACHE_SIZE = 1024
+    
+    # Cosine space matches the advisor's distance thresholds; denser graph (M,
+    # construction_ef) for better recall on 768-dim embeddings, lower search_ef for speed.
+    # HNSW settings only apply when the collection is created (clear_collection to rebuild).
+    COLLECTION_METADATA = {
+        "description": "Lithuanian legal codes and laws",
+        "hnsw:space": "cosine",
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 50,
+        "hnsw:num_threads": 4
+    }
+    
+    def __init__(self, persist_directory: str = "data/chroma_db", index_params: Optional[Dict] = None):
         """
         Initialize the RAG system with ChromaDB and multilingual embeddings
         
         Args:
             persist_directory: Where to store the vector database
+            index_params: HNSW overrides for COLLECTION_METADATA (e.g. {"hnsw:M": 16}
+                for a smaller graph on a large corpus); used when the collection is created
         """
         # Ensure directory exists
         os.makedirs(persist_directory, exist_ok=True)
         
+        # Corpus version stamp, rewritten whenever the collection changes (see corpus_version)
+        self.version_path = os.path.join(persist_directory, "corpus_version")
+        self._version_mtime: Optional[int] = None
+        self._corpus_version = ''
+        
         # Initialize ChromaDB with PersistentClient (new API)
         # This ensures data is actually saved to disk
         self.client = chromadb.PersistentClient(path=persist_directory)
+        self.collection_metadata = {**self.COLLECTION_METADATA, **(index_params or {})}
         
         # Create or get collection for legal documents
         self.collection = self.client.get_or_create_collection(
             name="legal_documents",
-            metadata={"description": "Lithuanian legal codes and laws"}
+            metadata=self.collection_metadata
         )
         
-        # Load multilingual sentence transformer
-        # This model supports Lithuanian and provides good semantic understanding
-        print("⏳ Loading multilingual embedding model...")
-        self.embedder = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
-        print("✅ Embedding model loaded")
+        # Shared multilingual sentence transformer (loaded once per process)
+        self.embedder = get_embedder()
+        
+        self._query_embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._query_lock = threading.Lock()
     
     def index_law(self, law_data: Dict):
         """
@@ -59,47 +152,133 @@ class LegalRAG:
                     ]
                 }
         """
-        print(f"\n📚 Indexing: {law_data['title']}")
-        print(f"   Articles: {len(law_data['articles'])}")
+        articles = law_data['articles']
+        self.index_law_columns({
+            'law_id': law_data['law_id'],
+            'title': law_data['title'],
+            'category': law_data.get('category', 'unknown'),
+            'numbers': [article['number'] for article in articles],
+            'titles': [article['title'] for article in articles],
+            'contents': [article['content'] for article in articles],
+        })
+    
+    def index_law_columns(self, law_data: Dict) -> np.ndarray:
+        """
+        Index a law whose articles are given column-wise (parallel lists)
         
-        documents = []
-        metadatas = []
-        ids = []
+        Args:
+            law_data: Law metadata plus one list per article field
+                {
+                    'law_id': 'TAIS.245495',
+                    'title': 'Civilinis kodeksas',
+                    'category': 'civilinė_teisė',
+                    'numbers': ['1.1', ...],
+                    'titles': ['Kodekso taikymo sritis', ...],
+                    'contents': ['...', ...],
+                    'embeddings': np.ndarray  # optional, from an earlier run - skips encoding
+                }
         
-        for article in law_data['articles']:
-            # Combine title and content for better semantic search
-            full_text = f"{article['title']}\n\n{article['content']}"
-            
-            documents.append(full_text)
-            metadatas.append({
-                "law_id": law_data['law_id'],
-                "law_title": law_data['title'],
-                "article_number": str(article['number']),
-                "article_title": article['title'],
-                "category": law_data.get('category', 'unknown')
-            })
-            ids.append(f"{law_data['law_id']}_art_{article['number']}")
-        
-        # Generate embeddings and add to collection
-        print("⏳ Generating embeddings...")
-        embeddings = self.embedder.encode(documents, show_progress_bar=True)
+        Returns:
+            Article embeddings, shape (len(numbers), dim)
+        """
+        law_id = law_data['law_id']
+        law_title = law_data['title']
+        category = law_data.get('category', 'unknown')
+        numbers = [str(number) for number in law_data['numbers']]
+        titles = law_data['titles']
+        contents = law_data['contents']
+        
+        print(f"\n📚 Indexing: {law_title}")
+        print(f"   Articles: {len(numbers)}")
+        
+        # Combine title and content for better semantic search
+        documents = [f"{title}\n\n{content}" for title, content in zip(titles, contents, strict=True)]
+        metadatas = [
+            {
+                "law_id": law_id,
+                "law_title": law_title,
+                "article_number": number,
+                "article_title": title,
+                "category": category,
+                # Short preview used in prompts, sliced once at index time
+                "content_preview": content[:self.PREVIEW_CHARS]
+            }
+            for number, title, content in zip(numbers, titles, contents, strict=True)
+        ]
+        ids = [f"{law_id}_art_{number}" for number in numbers]
+        
+        # Generate embeddings (unless precomputed) and add to collection
+        embeddings = law_data.get('embeddings')
+        if embeddings is None:
+            print("⏳ Generating embeddings...")
+            embeddings = self.embedder.encode(
+                documents,
+                batch_size=self.ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=True
+            )
         
         print("⏳ Adding to vector database...")
-        self.collection.add(
-            embeddings=embeddings.tolist(),
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Several smaller add() requests instead of one huge one
+        for start in range(0, len(documents), self.ADD_BATCH_SIZE):
+            end = start + self.ADD_BATCH_SIZE
+            self.collection.add(
+                embeddings=embeddings[start:end].astype('float32').tolist(),
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+        
+        self._stamp_corpus_version()
+        print(f"✅ Indexed {len(documents)} articles from {law_title}\n")
+        return embeddings
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Generate the embedding vector for a search query (cached per query string)"""
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries, encoding only the ones not in the query cache
+        
+        Returns:
+            Array of shape (len(queries), dim); rows are read-only (shared with the cache)
+        """
+        # Embeddings for this call; the shared cache may evict entries while we encode
+        found: Dict[str, np.ndarray] = {}
+        with self._query_lock:
+            for query in dict.fromkeys(queries):
+                embedding = self._query_embeddings.get(query)
+                if embedding is not None:
+                    found[query] = embedding
+        missing = [q for q in dict.fromkeys(queries) if q not in found]
+        
+        # Encode outside the lock - searches from other threads keep hitting the cache
+        encoded = self.embedder.encode(missing) if missing else []
+        
+        with self._query_lock:
+            for query, embedding in zip(missing, encoded, strict=True):
+                embedding.setflags(write=False)
+                self._query_embeddings[query] = embedding
+                found[query] = embedding
+            
+            # Best-effort LRU touch (entries may have been evicted by another thread)
+            for query in found:
+                if query in self._query_embeddings:
+                    self._query_embeddings.move_to_end(query)
+            
+            while len(self._query_embeddings) > self.QUERY_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
         
-        print(f"✅ Indexed {len(documents)} articles from {law_data['title']}\n")
+        return np.stack([found[query] for query in queries])
     
     def search_relevant_articles(
         self, 
         query: str, 
         top_k: int = 5,
-        category: Optional[str] = None
-    ) -> List[Dict]:
+        category: Optional[str] = None,
+        query_embedding=None
+    ) -> List[ArticleHit]:
         """
         Find the most relevant legal articles for a given query
         
@@ -107,16 +286,16 @@ class LegalRAG:
             query: User's legal question or search term
             top_k: Number of results to return
             category: Optional filter by legal category (e.g., 'civilinė_teisė')
+            query_embedding: Precomputed query embedding (skips re-encoding)
         
         Returns:
             List of relevant articles with metadata and similarity scores
         """
-        print(f"\n🔍 Searching for: '{query}'")
-        if category:
-            print(f"   Category filter: {category}")
+        logger.debug("Searching (category: %s): %s", category, query)
         
         # Generate query embedding
-        query_embedding = self.embedder.encode([query])[0]
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
         
         # Build where filter if category specified
         where_filter = {"category": category} if category else None
@@ -128,20 +307,60 @@ class LegalRAG:
             where=where_filter
         )
         
-        # Format results
+        formatted_results = self._format_results(results, 0)
+        
+        logger.debug("Found %d relevant articles", len(formatted_results))
+        return formatted_results
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        category: Optional[str] = None
+    ) -> List[List[ArticleHit]]:
+        """
+        Search for several queries at once
+        
+        All queries are embedded in one encode() call and sent to ChromaDB as a
+        single multi-query request.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            category: Optional filter by legal category
+        
+        Returns:
+            One result list per query (same format as search_relevant_articles)
+        """
+        if not queries:
+            return []
+        
+        logger.debug("Batch search: %d queries", len(queries))
+        query_embeddings = self.embed_queries(queries)
+        
+        results = self.collection.query(
+            query_embeddings=query_embeddings.tolist(),
+            n_results=top_k,
+            where={"category": category} if category else None
+        )
+        
+        return [self._format_results(results, q) for q in range(len(queries))]
+    
+    def _format_results(self, results: Dict, q: int) -> List[ArticleHit]:
+        """Format ChromaDB query results for the q-th query"""
         formatted_results = []
-        for i in range(len(results['ids'][0])):
-            formatted_results.append({
-                'article_id': results['ids'][0][i],
-                'law_title': results['metadatas'][0][i]['law_title'],
-                'article_number': results['metadatas'][0][i]['article_number'],
-                'article_title': results['metadatas'][0][i]['article_title'],
-                'content': results['documents'][0][i],
-                'distance': results['distances'][0][i] if 'distances' in results else None,
-                'metadata': results['metadatas'][0][i]
-            })
-        
-        print(f"✅ Found {len(formatted_results)} relevant articles\n")
+        for i in range(len(results['ids'][q])):
+            metadata = results['metadatas'][q][i]
+            formatted_results.append(ArticleHit(
+                article_id=results['ids'][q][i],
+                law_title=metadata['law_title'],
+                article_number=metadata['article_number'],
+                article_title=metadata['article_title'],
+                content=results['documents'][q][i],
+                content_preview=metadata.get('content_preview'),
+                distance=results['distances'][q][i] if 'distances' in results else None,
+                metadata=metadata
+            ))
         return formatted_results
     
     def get_collection_stats(self) -> Dict:
@@ -157,9 +376,44 @@ class LegalRAG:
         self.client.delete_collection(name="legal_documents")
         self.collection = self.client.create_collection(
             name="legal_documents",
-            metadata={"description": "Lithuanian legal codes and laws"}
+            metadata=self.collection_metadata
         )
+        self._stamp_corpus_version()
         print("⚠️ Collection cleared")
+    
+    def corpus_version(self) -> str:
+        """
+        Version of the indexed corpus - changes whenever a law is (re)indexed,
+        including by the indexing scripts running in another process
+        
+        The stamp file is only re-read when its mtime changes.
+        """
+        try:
+            mtime = os.stat(self.version_path).st_mtime_ns
+        except FileNotFoundError:
+            return ''
+        if mtime != self._version_mtime:
+            with open(self.version_path, encoding='utf-8') as f:
+                self._corpus_version = f.read().strip()
+            self._version_mtime = mtime
+        return self._corpus_version
+    
+    def _stamp_corpus_version(self):
+        """Give the corpus a new version (after any change to the collection)"""
+        with open(self.version_path, 'w', encoding='utf-8') as f:
+            f.write(uuid.uuid4().hex)
+
+
+# Process-wide instance (embedding model + ChromaDB client are loaded once)
+_INSTANCE: Optional[LegalRAG] = None
+
+
+def get_rag() -> LegalRAG:
+    """Get the shared LegalRAG instance, initializing it on first use"""
+    global _INSTANCE
+    if _INSTANCE is None:
+        _INSTANCE = LegalRAG()
+    return _INSTANCE
 
 
 # Test code
@@ -199,9 +453,9 @@ if __name__ == "__main__":
     print("📊 SEARCH RESULTS:")
     print("-"*70)
     for i, result in enumerate(results, 1):
-        print(f"\n{i}. {result['law_title']} - Straipsnis {result['article_number']}")
-        print(f"   {result['article_title']}")
-        print(f"   Distance: {result['distance']:.4f}")
+        print(f"\n{i}. {result.law_title} - Straipsnis {result.article_number}")
+        print(f"   {result.article_title}")
+        print(f"   Distance: {result.distance:.4f}")
     
     # Stats
     stats = rag.get_collection_stats()
@@ -4,10 +4,25 @@ Chat API routes
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.agents.gemini_agent import GeminiAgent
+from typing import Optional
 import os
 
 router = APIRouter()
 
+# One agent per process - reuses the Gemini client connection and the
+# in-memory conversation histories across requests
+_agent: Optional[GeminiAgent] = None
+
+def _get_agent() -> GeminiAgent:
+    """Get the shared GeminiAgent, creating it on first use"""
+    global _agent
+    if _agent is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise HTTPException(status_code=500, detail="API key not configured")
+        _agent = GeminiAgent(api_key)
+    return _agent
+
 class ChatRequest(BaseModel):
     message: str
     conversation_id: str = None
@@ -20,11 +35,7 @@ class ChatResponse(BaseModel):
 async def send_message(request: ChatRequest):
     """Send a message to AI"""
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="API key not configured")
-        
-        agent = GeminiAgent(api_key)
+        agent = _get_agent()
         response = await agent.chat(request.message, request.conversation_id)
         
         return ChatResponse(
@@ -1,32 +1,60 @@
 ﻿"""
 Scraper API routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request, Response
 from pydantic import BaseModel
-from backend.scrapers.seimas_scraper import SeimasScraper
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import time
 
 router = APIRouter()
 
+# Recent scrape results: (document_type, limit) -> (expires_at, etag, documents)
+SCRAPE_CACHE_TTL = 300
+_scrape_cache: Dict[Tuple[str, int], Tuple[float, str, List[Dict]]] = {}
+
 class ScrapeRequest(BaseModel):
     url: Optional[str] = None
     document_type: str = "all"
     limit: int = 10
 
 @router.post("/scrape")
-async def scrape_documents(request: ScrapeRequest):
-    """Scrape legal documents"""
+async def scrape_documents(request: ScrapeRequest, http_request: Request, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Scrape legal documents
+
+    Results are reused for SCRAPE_CACHE_TTL seconds and tagged with an ETag;
+    a client sending the current ETag in If-None-Match gets 304 without a body.
+    """
     try:
-        scraper = SeimasScraper()
-        documents = await scraper.scrape_documents(
-            document_type=request.document_type,
-            limit=request.limit
-        )
+        key = (request.document_type, request.limit)
+        cached = _scrape_cache.get(key)
+        if cached and cached[0] > time.time():
+            _, etag, documents = cached
+        else:
+            # One SeimasScraper per app (see lifespan) so its HTTP session is reused
+            scraper = http_request.app.state.seimas_scraper
+            documents = await scraper.scrape_documents(
+                document_type=request.document_type,
+                limit=request.limit
+            )
+            body = json.dumps(documents, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            # Failed scrapes raise (nothing cached); an empty listing is retried next time too
+            if documents:
+                _scrape_cache[key] = (time.time() + SCRAPE_CACHE_TTL, etag, documents)
+
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        response.headers["ETag"] = etag
         return documents
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/status")
-async def scraper_status():
+async def scraper_status(response: Response):
     """Get scraper status"""
+    response.headers["Cache-Control"] = "public, max-age=60"
     return {"status": "operational", "sources": ["e-seimas.lt"]}
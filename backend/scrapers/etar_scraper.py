@@ -1,15 +1,49 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+import asyncio
+import logging
+import orjson
 import re
 from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 class ETARScraper:
     """
     Web scraper for e-tar.lt (Teisės aktų registras)
     """
 
+    # Extracted articles are reused for 24h (article texts change very rarely)
+    ARTICLE_CACHE_TTL = 24 * 3600
+
+    # Downloaded laws (data/{tais_id}_text.txt) are served from disk for 7 days,
+    # then revalidated with a conditional request
+    LAW_CACHE_TTL = 7 * 24 * 3600
+
+    # fetch_law_by_id streams the page into lxml in chunks of this size
+    STREAM_CHUNK_SIZE = 64 * 1024
+    # Elements whose contents are not document text (bs4's get_text skips them too)
+    NON_TEXT_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+
+    # Article headings at line starts: "52 straipsnis. Title", "52. Title", ...
+    # Lookaheads, so one finditer pass also finds headings on consecutive lines
+    ARTICLE_HEADING = re.compile(
+        r'^(?=((\d+)\.?\s+(?:straipsnis)?\s*[A-ZĄČĘĖĮŠŲŪŽ][^\n]*))',
+        re.IGNORECASE | re.MULTILINE
+    )
+    ARTICLE_HEADING_FALLBACK = re.compile(r'^(?=((\d+)\.\s+[^\n]+))', re.MULTILINE)
+    NEXT_ARTICLE = re.compile(r'\n\d+\.?\s+(?:straipsnis|[A-Z])')
+    EXCESS_NEWLINES = re.compile(r'\n{3,}')
+    UNSAFE_FILENAME_CHARS = re.compile(r'[^a-z0-9_]')
+
+    # Codices whose e-TAR layout is known: TAIS ID -> class of the content div.
+    # These skip the generic selector probing in fetch_law_by_id
+    _KNOWN_LAWS = {
+        'TAIS.245495': 'legal-act-content',  # Darbo kodeksas
+    }
+
     def __init__(self):
         self.base_url = "https://www.e-tar.lt"
         self.session = requests.Session()
@@ -17,6 +51,12 @@ class ETARScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
 
+        # Extracted articles by number (fetch_articles_async): number -> (expires_at, article)
+        self._article_cache: Dict[int, Tuple[float, dict]] = {}
+
+        # Loaded Darbo kodeksas text and its heading index (see _load_article_index)
+        self._article_index = None
+
         # Ensure data directory exists
         os.makedirs('data', exist_ok=True)
 
@@ -30,32 +70,34 @@ class ETARScraper:
         # Darbo kodeksas official URL (ID: dad7f3307a7011e6b969d7ae07280e89)
         url = "https://www.e-tar.lt/portal/lt/legalAct/dad7f3307a7011e6b969d7ae07280e89/asr"
 
-        print("="*70)
-        print("🔍 FETCHING DARBO KODEKSAS FROM E-TAR")
-        print("="*70)
-        print(f"\n📍 URL: {url}\n")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("=" * 70)
+            logger.info("Fetching Darbo kodeksas from e-TAR: %s", url)
+            logger.info("=" * 70)
 
         try:
             # Make request
-            print("⏳ Sending HTTP request...")
+            logger.debug("Sending HTTP request...")
             response = self.session.get(url, timeout=20)
 
             # Check status
             if response.status_code != 200:
-                print(f"❌ HTTP Error: {response.status_code}")
+                logger.error("HTTP Error: %s", response.status_code)
                 return None
 
-            print(f"✅ Response received: {len(response.content):,} bytes\n")
+            logger.debug("Response received: %d bytes", len(response.content))
 
             # Parse HTML
-            print("⏳ Parsing HTML...")
-            soup = BeautifulSoup(response.content, 'html.parser')
+            logger.debug("Parsing HTML...")
+            # bs4 + lxml are imported on first parse, not when the API imports this module
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(response.content, 'lxml', from_encoding='utf-8')
 
-            # Save raw HTML for inspection
+            # Save raw HTML for inspection (the bytes as received - no re-serializing the tree)
             html_path = 'data/darbo_kodeksas_raw.html'
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(soup.prettify())
-            print(f"✅ Saved raw HTML → {html_path}\n")
+            with open(html_path, 'wb') as f:
+                f.write(response.content)
+            logger.debug("Saved raw HTML -> %s", html_path)
 
             # Extract title
             title_elem = soup.find('h1') or soup.find('title')
@@ -63,7 +105,7 @@ class ETARScraper:
             # print(f"📋 Document Title: {title}\n") # Dangerous on Windows
 
             # Extract main content
-            print("⏳ Extracting text content...")
+            logger.debug("Extracting text content...")
 
             # Try multiple strategies to find content
             content = None
@@ -84,35 +126,22 @@ class ETARScraper:
 
             # Strategy 2: Fallback to body
             if not content:
-                print("⚠️  No specific content div found, using body")
+                logger.warning("No specific content div found, using body")
                 content = soup.body
 
-            # Extract text
-            if content:
-                full_text = content.get_text(separator='\n', strip=True)
-            else:
-                full_text = soup.get_text(separator='\n', strip=True)
-
-            # Clean up text
-            full_text = re.sub(r'\n{3,}', '\n\n', full_text)  # Max 2 newlines
+            # Extract text (max 2 newlines)
+            full_text = self._extract_text((content or soup).stripped_strings)
 
-            print(f"✅ Extracted {len(full_text):,} characters\n")
+            logger.debug("Extracted %d characters", len(full_text))
 
             # Save text
             text_path = 'data/darbo_kodeksas_text.txt'
-            with open(text_path, 'w', encoding='utf-8') as f:
-                f.write(full_text)
-            print(f"✅ Saved text → {text_path}\n")
+            self._write_text(text_path, full_text)
+            logger.info("Saved text -> %s", text_path)
 
-            # Show preview
-            print("📄 TEXT PREVIEW (first 600 chars):")
-            print("-"*70)
-            # print(full_text[:600]) # Dangerous on Windows
-            print("...")
-            print("-"*70)
 
             # Analyze structure
-            print("\n🔍 ANALYZING STRUCTURE...\n")
+            logger.debug("Analyzing structure...")
             self._analyze_structure(soup, full_text)
 
             # Return result
@@ -126,43 +155,111 @@ class ETARScraper:
 
             # Save JSON
             json_path = 'data/darbo_kodeksas_metadata.json'
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump({k: v for k, v in result.items() if k != 'full_text'},
-                         f, ensure_ascii=False, indent=2)
-            print(f"\n✅ Saved metadata → {json_path}")
+            self._write_json(json_path, {k: v for k, v in result.items() if k != 'full_text'})
+            logger.debug("Saved metadata -> %s", json_path)
 
             return result
 
         except requests.RequestException as e:
-            print(f"❌ Network Error: {e}")
+            logger.error("Network Error: %s", e)
             return None
         except Exception as e:
-            print(f"❌ Unexpected Error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Unexpected Error: %s", e)
             return None
 
+    def _extract_text(self, strings) -> str:
+        r"""
+        Same as get_text(separator='\n', strip=True) followed by collapsing 3+ newlines,
+        in one pass over the text nodes
+
+        Stripped strings are joined by a single newline, so newline runs can only occur
+        inside a string - only those few strings go through the regex, instead of a
+        second sweep (and copy) of the whole multi-megabyte text.
+
+        Args:
+            strings: Stripped text nodes (bs4 Tag.stripped_strings or _stripped_strings)
+        """
+        return '\n'.join(
+            self.EXCESS_NEWLINES.sub('\n\n', text) if '\n\n\n' in text else text
+            for text in strings
+        )
+
+    def _parse_streamed(self, response):
+        """
+        Parse a streamed HTML response chunk by chunk with lxml
+
+        Returns:
+            tuple: (root element, bytes received)
+        """
+        from lxml import etree
+        parser = etree.HTMLParser(encoding='utf-8')
+        received = 0
+        for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+            received += len(chunk)
+        return parser.close(), received
+
+    def _stripped_strings(self, node):
+        """
+        lxml counterpart of bs4's Tag.stripped_strings: non-empty stripped text nodes
+        in document order, skipping comments and the contents of NON_TEXT_TAGS
+        """
+        from lxml import etree
+        walker = etree.iterwalk(node, events=('start', 'end', 'comment', 'pi'))
+        for event, element in walker:
+            if event == 'start':
+                if element.tag in self.NON_TEXT_TAGS:
+                    walker.skip_subtree()
+                    continue
+                text = element.text
+            else:
+                # A node's tail is text that follows it inside its parent
+                # (comments and processing instructions only contribute their tail)
+                if element is node:
+                    continue
+                text = element.tail
+            if text:
+                text = text.strip()
+                if text:
+                    yield text
+
+    @staticmethod
+    def _find_first(root, xpath):
+        """First element matching xpath (document order), or None"""
+        matches = root.xpath(xpath)
+        return matches[0] if matches else None
+
+    @staticmethod
+    def _class_xpath(class_name):
+        """XPath for a div having class_name among its classes (like bs4's class matching)"""
+        return f".//div[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
     def _analyze_structure(self, soup, text):
         """
         Analyze document structure to find articles
         """
-        # Look for article patterns
-        article_pattern = re.compile(r'(\d+)\s+straipsnis', re.IGNORECASE)
-        matches = article_pattern.findall(text)
-
-        if matches:
-            article_numbers = sorted(set(int(m) for m in matches))
-            print(f"📊 Found {len(article_numbers)} articles")
-            print(f"   Range: Article {min(article_numbers)} - {max(article_numbers)}")
-            print(f"   Examples: {article_numbers[:5]}...")
+        # Article headings start a line ("52 straipsnis. ..."), so a plain line scan
+        # finds them without running the regex engine over every position of the text
+        found = set()
+        for line in text.split('\n'):
+            if line[:1].isdecimal() and ' straipsnis' in line[:40].lower():
+                number = line.split(None, 1)[0]
+                if number.isdecimal():
+                    found.add(int(number))
+
+        if found:
+            article_numbers = sorted(found)
+            logger.info(
+                "Found %d articles (range %d - %d, e.g. %s)",
+                len(article_numbers), min(article_numbers), max(article_numbers), article_numbers[:5]
+            )
         else:
-            print("⚠️  No article pattern found - may need different regex")
+            logger.warning("No article pattern found - may need different regex")
 
         # Look for specific test article (52 - remote work)
-        if '52' in matches:
-            print("\n✅ Article 52 detected (test article)")
+        if 52 in found:
+            logger.debug("Article 52 detected (test article)")
 
-        print()
 
     def fetch_article(self, article_number):
         """
@@ -174,47 +271,61 @@ class ETARScraper:
         Returns:
             dict: {article_number, title, content, source_url}
         """
-        print(f"\n🔍 Extracting Article {article_number}...\n")
+        return self.fetch_articles([article_number]).get(article_number)
 
+    def fetch_articles(self, article_numbers: Iterable[int]) -> Dict[int, dict]:
+        """
+        Extract several articles with one load of the text and its heading index
+
+        Args:
+            article_numbers: Article numbers (e.g., [52, 53])
+
+        Returns:
+            dict: {article_number: article dict (same shape as fetch_article)} for found articles
+        """
         # First, ensure we have the full text
         if not os.path.exists('data/darbo_kodeksas_text.txt'):
-            print("⏳ Fetching full Darbo kodeksas first...")
+            logger.info("Fetching full Darbo kodeksas first...")
             result = self.fetch_darbo_kodeksas()
             if not result:
-                return None
+                return {}
+
+        # Text and heading index are loaded once per version of the file
+        full_text, headings, fallback_headings = self._load_article_index()
 
-        # Load text
-        with open('data/darbo_kodeksas_text.txt', 'r', encoding='utf-8') as f:
-            full_text = f.read()
+        # One timestamp for the whole batch rather than a datetime per article
+        fetched_at = datetime.now().isoformat()
 
-        # Pattern to find article
-        # Matches: "52 straipsnis", "52.", "52 ", followed by title
-        # Improved regex to be more flexible with whitespace and punctuation
-        pattern = rf'(?:^|\n)({article_number}\.?\s+(?:straipsnis)?\s*[A-ZĄČĘĖĮŠŲŪŽ][^\n]*)'
+        articles = {}
+        for article_number in article_numbers:
+            article = self._extract_article(full_text, headings, fallback_headings, article_number, fetched_at)
+            if article:
+                articles[article_number] = article
+        return articles
 
-        match = re.search(pattern, full_text, re.IGNORECASE | re.MULTILINE)
+    def _extract_article(self, full_text, headings, fallback_headings, article_number, fetched_at):
+        """Cut one article out of the indexed text and save it to data/article_N.json"""
+        logger.debug("Extracting article %s", article_number)
 
-        if not match:
-            # Fallback strategy: Try searching just for the number at start of line
-            fallback_pattern = rf'(?:^|\n)({article_number}\.\s+[^\n]+)'
-            match = re.search(fallback_pattern, full_text, re.MULTILINE)
+        # Matches: "52 straipsnis", "52.", "52 ", followed by title;
+        # fallback: just the number and a dot at start of line
+        heading = headings.get(str(article_number)) or fallback_headings.get(str(article_number))
 
-        if not match:
-            print(f"❌ Article {article_number} not found with standard patterns")
+        if not heading:
+            logger.warning("Article %s not found with standard patterns", article_number)
             return None
 
-        article_start = match.start(1) # Start of the capturing group
-        article_title = match.group(1).strip()
+        article_start, article_title = heading
+        article_title = article_title.strip()
 
         # print(f"✅ Found: {article_title}") # Dangerous on Windows
 
         # Find where article ends (next article start)
         # Look for next number followed by dot or 'straipsnis'
-        next_article_pattern = r'\n\d+\.?\s+(?:straipsnis|[A-Z])'
-        next_match = re.search(next_article_pattern, full_text[article_start + 10:])
+        next_match = self.NEXT_ARTICLE.search(full_text, article_start + 10)
 
         if next_match:
-            article_end = article_start + 10 + next_match.start()
+            article_end = next_match.start()
         else:
             # Last article or section, limit to avoid grabbing too much
             # If no next match, take up to 4000 chars or double newlines
@@ -226,14 +337,8 @@ class ETARScraper:
 
         article_content = full_text[article_start:article_end].strip()
 
-        print(f"📏 Content length: {len(article_content)} characters\n")
+        logger.debug("Content length: %d characters", len(article_content))
 
-        # Preview
-        print("📄 CONTENT PREVIEW:")
-        print("-"*70)
-        # print(article_content[:400]) # Dangerous on Windows
-        print("...")
-        print("-"*70)
 
         # Save to JSON
         article_data = {
@@ -242,24 +347,83 @@ class ETARScraper:
             'content': article_content,
             'length': len(article_content),
             'source_url': 'https://www.e-tar.lt/portal/lt/legalAct/TAR.3C2CABAAedbb/asr',
-            'fetched_at': datetime.now().isoformat()
+            'fetched_at': fetched_at
         }
 
         json_path = f'data/article_{article_number}.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(article_data, f, ensure_ascii=False, indent=2)
+        self._write_json(json_path, article_data)
 
-        print(f"\n✅ Saved → {json_path}")
+        logger.debug("Saved -> %s", json_path)
 
         return article_data
 
-    def fetch_law_by_id(self, tais_id: str, law_name: str = None) -> dict:
+    def _load_article_index(self):
+        """
+        Load the Darbo kodeksas text and index its article headings in one pass
+
+        Returns:
+            tuple: (full_text, {number: (start, heading)}, fallback {number: (start, heading)})
+        """
+        text_path = 'data/darbo_kodeksas_text.txt'
+        mtime = os.path.getmtime(text_path)
+        if self._article_index is None or self._article_index[0] != mtime:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                full_text = f.read()
+
+            # First heading per number wins, as with a per-article re.search
+            headings, fallback_headings = {}, {}
+            for match in self.ARTICLE_HEADING.finditer(full_text):
+                headings.setdefault(match.group(2), (match.start(1), match.group(1)))
+            for match in self.ARTICLE_HEADING_FALLBACK.finditer(full_text):
+                fallback_headings.setdefault(match.group(2), (match.start(1), match.group(1)))
+
+            # One tuple assignment - worker threads (fetch_articles_async) never see a half-built index
+            self._article_index = (mtime, full_text, headings, fallback_headings)
+
+        return self._article_index[1:]
+
+    async def fetch_articles_async(self, article_numbers: List[int]) -> List[dict]:
+        """
+        Extract several articles without blocking the event loop, reusing previously extracted ones
+
+        Args:
+            article_numbers: Article numbers (e.g., [52, 53])
+
+        Returns:
+            list: Article dicts (same shape as fetch_article) for articles that were found
+        """
+        # Fetch the full text once up front so concurrent extractions don't race to download it
+        if not os.path.exists('data/darbo_kodeksas_text.txt'):
+            result = await self.fetch_darbo_kodeksas_async()
+            if not result:
+                return []
+
+        now = time.time()
+        found = {}
+        for number in article_numbers:
+            cached = self._article_cache.get(number)
+            if cached and cached[0] > now:
+                found[number] = cached[1]
+
+        # All misses are extracted in one worker thread, sharing one index lookup pass
+        misses = [number for number in dict.fromkeys(article_numbers) if number not in found]
+        if misses:
+            extracted = await asyncio.to_thread(self.fetch_articles, misses)
+            expires_at = time.time() + self.ARTICLE_CACHE_TTL
+            for number, article in extracted.items():
+                self._article_cache[number] = (expires_at, article)
+            found.update(extracted)
+
+        return [found[number] for number in article_numbers if number in found]
+
+    def fetch_law_by_id(self, tais_id: str, law_name: str = None, force_refresh: bool = False) -> dict:
         """
         Fetch any law from e-TAR by its TAIS ID
 
         Args:
             tais_id: TAIS identifier (e.g., 'TAIS.245495' or just '245495')
             law_name: Optional name for the law (for display)
+            force_refresh: Revalidate with e-TAR even if the saved copy is fresh
 
         Returns:
             dict: {law_id, title, url, full_text, length, fetched_at}
@@ -273,70 +437,98 @@ class ETARScraper:
         # We'll try the TAIS format first
         url = f"{self.base_url}/portal/lt/legalAct/{tais_id}/asr"
 
-        print("="*70)
-        print(f"🔍 FETCHING LAW: {law_name or tais_id}")
-        print("="*70)
-        print(f"\n📍 URL: {url}\n")
+        safe_filename = self.UNSAFE_FILENAME_CHARS.sub('_', tais_id.lower())
+        text_path = f'data/{safe_filename}_text.txt'
+        json_path = f'data/{safe_filename}_metadata.json'
+
+        # Saved copy from a previous fetch: fresh -> no request at all
+        cached = self._load_saved_law(text_path, json_path)
+        if cached and not force_refresh:
+            age = datetime.now() - datetime.fromisoformat(cached[0]['fetched_at'])
+            if age.total_seconds() < self.LAW_CACHE_TTL:
+                logger.info("Using saved copy of %s -> %s", law_name or tais_id, text_path)
+                return self._saved_law_result(*cached)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("=" * 70)
+            logger.info("Fetching law %s from e-TAR: %s", law_name or tais_id, url)
+            logger.info("=" * 70)
 
         try:
-            # Make request
-            print("⏳ Sending HTTP request...")
-            response = self.session.get(url, timeout=30)
+            # Stale saved copy -> conditional request, e-TAR answers 304 if unchanged
+            headers = {}
+            if cached:
+                if cached[0].get('etag'):
+                    headers['If-None-Match'] = cached[0]['etag']
+                if cached[0].get('last_modified'):
+                    headers['If-Modified-Since'] = cached[0]['last_modified']
+
+            # Make request - streamed, so the body is parsed while it downloads
+            # instead of first being held in memory as one multi-megabyte bytes object
+            logger.debug("Sending HTTP request...")
+            response = self.session.get(url, timeout=30, headers=headers, stream=True)
+
+            if response.status_code == 304 and cached:
+                response.close()
+                logger.info("Not modified - using saved copy")
+                metadata, full_text = cached
+                metadata['fetched_at'] = datetime.now().isoformat()
+                self._write_json(json_path, metadata)
+                return self._saved_law_result(metadata, full_text)
 
             # Check status
             if response.status_code != 200:
-                print(f"❌ HTTP Error: {response.status_code}")
+                response.close()
+                logger.error("HTTP Error: %s", response.status_code)
                 return None
 
-            print(f"✅ Response received: {len(response.content):,} bytes\n")
-
             # Parse HTML
-            print("⏳ Parsing HTML...")
-            soup = BeautifulSoup(response.content, 'html.parser')
+            logger.debug("Downloading and parsing HTML...")
+            root, received = self._parse_streamed(response)
+            logger.debug("Response received: %d bytes", received)
 
             # Extract title
-            title_elem = soup.find('h1') or soup.find('title')
-            title = title_elem.get_text(strip=True) if title_elem else (law_name or tais_id)
-            print(f"📋 Document Title: {title[:100]}...\n")
+            title_elem = self._find_first(root, './/h1')
+            if title_elem is None:
+                title_elem = self._find_first(root, './/title')
+            title = ''.join(self._stripped_strings(title_elem)) if title_elem is not None else (law_name or tais_id)
+            logger.debug("Document title: %s", title[:100])
 
             # Extract main content
-            print("⏳ Extracting text content...")
+            logger.debug("Extracting text content...")
 
-            # Try multiple strategies to find content
+            # Known codex -> its content div directly
             content = None
-            content_selectors = [
-                {'class': 'legal-act-content'},
-                {'class': 'document-content'},
-                {'id': 'documentContent'},
-                {'class': 'act-text'},
-            ]
-
-            for selector in content_selectors:
-                content = soup.find('div', selector)
-                if content and len(content.get_text(strip=True)) > 5000:
-                    break
+            known_class = self._KNOWN_LAWS.get(tais_id)
+            if known_class:
+                content = self._find_first(root, self._class_xpath(known_class))
+
+            # Otherwise (or if the layout changed) try multiple strategies to find content
+            if content is None:
+                content_selectors = [
+                    self._class_xpath('legal-act-content'),
+                    self._class_xpath('document-content'),
+                    ".//div[@id='documentContent']",
+                    self._class_xpath('act-text'),
+                ]
+
+                for selector in content_selectors:
+                    content = self._find_first(root, selector)
+                    if content is not None and sum(map(len, self._stripped_strings(content))) > 5000:
+                        break
 
             # Fallback to body
-            if not content:
-                content = soup.body
-
-            # Extract text
-            if content:
-                full_text = content.get_text(separator='\n', strip=True)
-            else:
-                full_text = soup.get_text(separator='\n', strip=True)
+            if content is None:
+                content = root.find('body')
 
-            # Clean up text
-            full_text = re.sub(r'\n{3,}', '\n\n', full_text)
+            # Extract text (max 2 newlines)
+            full_text = self._extract_text(self._stripped_strings(content if content is not None else root))
 
-            print(f"✅ Extracted {len(full_text):,} characters\n")
+            logger.debug("Extracted %d characters", len(full_text))
 
             # Save text
-            safe_filename = re.sub(r'[^a-z0-9_]', '_', tais_id.lower())
-            text_path = f'data/{safe_filename}_text.txt'
-            with open(text_path, 'w', encoding='utf-8') as f:
-                f.write(full_text)
-            print(f"✅ Saved text → {text_path}\n")
+            self._write_text(text_path, full_text)
+            logger.info("Saved text -> %s", text_path)
 
             # Return result
             result = {
@@ -348,27 +540,80 @@ class ETARScraper:
                 'fetched_at': datetime.now().isoformat()
             }
 
-            # Save metadata
-            json_path = f'data/{safe_filename}_metadata.json'
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump({k: v for k, v in result.items() if k != 'full_text'},
-                         f, ensure_ascii=False, indent=2)
-            print(f"✅ Saved metadata → {json_path}")
+            # Save metadata (with validators for the next conditional request)
+            metadata = {k: v for k, v in result.items() if k != 'full_text'}
+            metadata['etag'] = response.headers.get('ETag')
+            metadata['last_modified'] = response.headers.get('Last-Modified')
+            self._write_json(json_path, metadata)
+            logger.debug("Saved metadata -> %s", json_path)
 
             return result
 
         except requests.RequestException as e:
-            print(f"❌ Network Error: {e}")
+            logger.error("Network Error: %s", e)
             return None
         except Exception as e:
-            print(f"❌ Unexpected Error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Unexpected Error: %s", e)
+            return None
+
+    # Text is encoded once and written as bytes - no TextIOWrapper codec/buffering
+    # layer for multi-megabyte strings; JSON comes out of orjson as bytes already
+    @staticmethod
+    def _write_text(path: str, text: str):
+        with open(path, 'wb') as f:
+            f.write(text.encode('utf-8'))
+
+    @staticmethod
+    def _write_json(path: str, data: dict):
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    @staticmethod
+    def _load_saved_law(text_path: str, json_path: str):
+        """
+        Load a law saved by fetch_law_by_id
+
+        Returns:
+            tuple: (metadata, full_text), or None if there is no usable saved copy
+        """
+        if not (os.path.exists(text_path) and os.path.exists(json_path)):
+            return None
+        try:
+            with open(json_path, 'rb') as f:
+                metadata = orjson.loads(f.read())
+            with open(text_path, 'r', encoding='utf-8') as f:
+                full_text = f.read()
+            # Older or hand-edited metadata without these can't be served
+            datetime.fromisoformat(metadata['fetched_at'])
+            metadata['law_id'], metadata['title'], metadata['url']
+            return metadata, full_text
+        except (OSError, ValueError, KeyError, TypeError):
             return None
 
+    @staticmethod
+    def _saved_law_result(metadata: dict, full_text: str) -> dict:
+        """Rebuild the fetch_law_by_id result from a saved copy"""
+        return {
+            'law_id': metadata['law_id'],
+            'title': metadata['title'],
+            'url': metadata['url'],
+            'full_text': full_text,
+            'length': len(full_text),
+            'fetched_at': metadata['fetched_at']
+        }
+
+    # Async variants for API handlers: the sync fetches block for up to 20-30s,
+    # so they run in a worker thread instead of on the event loop.
+    # CLI scripts (index_laws.py, index_civilinis.py) keep using the sync methods.
+    async def fetch_darbo_kodeksas_async(self):
+        """fetch_darbo_kodeksas without blocking the event loop"""
+        return await asyncio.to_thread(self.fetch_darbo_kodeksas)
+
 
 # TEST CODE
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
     print("\n" + "="*70)
     print("🧪 E-TAR SCRAPER TEST")
     print("="*70 + "\n")
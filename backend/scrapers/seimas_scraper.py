@@ -1,8 +1,8 @@
 ﻿"""
 E-Seimas.lt web scraper
 """
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+from selectolax.parser import HTMLParser
 from typing import List, Dict, Optional
 import logging
 
@@ -11,37 +11,58 @@ logger = logging.getLogger(__name__)
 class SeimasScraper:
     def __init__(self):
         self.base_url = "https://e-seimas.lrs.lt"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0'
-        })
+        }
+        self.timeout = aiohttp.ClientTimeout(total=10)
+        # Created on first use - aiohttp sessions must be opened inside a running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
     
-    async def scrape_documents(self, document_type: str = "all", limit: int = 10) -> List[Dict]:
-        """Scrape legal documents"""
-        try:
-            url = f"{self.base_url}/portal/legalAct/lt/TAK"
-            response = self.session.get(url, timeout=10)
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session (keep-alive connections are reused between calls)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout)
+        return self._session
+    
+    async def _fetch(self, url: str) -> bytes:
+        """Download a page without blocking the event loop"""
+        session = await self._get_session()
+        async with session.get(url) as response:
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            documents = []
-            
-            doc_items = soup.select('.document-item')[:limit]
-            
-            for item in doc_items:
-                try:
-                    title = item.select_one('.title')
-                    link = item.select_one('a')
-                    
-                    if title and link:
-                        documents.append({
-                            'title': title.get_text(strip=True),
-                            'url': self.base_url + link.get('href', '')
-                        })
-                except Exception as e:
-                    continue
-            
-            return documents
-        except Exception as e:
-            logger.error(f"Error: {e}")
-            return []
+            return await response.read()
+    
+    async def close(self):
+        """Close the HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def scrape_documents(self, document_type: str = "all", limit: int = 10) -> List[Dict]:
+        """
+        Scrape legal documents
+
+        Raises aiohttp errors when e-Seimas can't be reached, so callers can tell
+        a failed request from an empty listing.
+        """
+        url = f"{self.base_url}/portal/legalAct/lt/TAK"
+        html = await self._fetch(url)
+        
+        # Read-only CSS selection - selectolax skips building a mutable bs4 tree
+        tree = HTMLParser(html)
+        documents = []
+        
+        doc_items = tree.css('.document-item')[:limit]
+        
+        for item in doc_items:
+            try:
+                title = item.css_first('.title')
+                link = item.css_first('a')
+                
+                if title and link:
+                    documents.append({
+                        'title': title.text(strip=True),
+                        'url': self.base_url + (link.attributes.get('href') or '')
+                    })
+            except Exception:
+                continue
+        
+        return documents
@@ -3,13 +3,13 @@ Diagnostics script - checks all configuration and dependencies
 """
 import os
 import sys
-from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 def check_environment():
     """Check environment variables"""
+    from dotenv import load_dotenv
     load_dotenv()
     
     print("[*] ENVIRONMENT VARIABLES CHECK")
@@ -5,91 +5,158 @@ Run this to populate the knowledge base
 
 import sys
 import os
+import hashlib
+import logging
+import mmap
+import re
+
+import numpy as np
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.rag.vector_store import LegalRAG
+from backend.rag.vector_store import EMBEDDING_MODEL, LegalRAG
 from backend.scrapers.etar_scraper import ETARScraper
 
+logger = logging.getLogger(__name__)
+
+# Darbo kodeksas article headers: "52 straipsnis. Nuotolinis darbas"
+# Matched on the raw UTF-8 bytes; \xc2\xa0 (no-break space) counts as whitespace like in str patterns
+ARTICLE_PATTERN = re.compile(
+    rb'(\d+)(?:\s|\xc2\xa0)+straipsnis(?:[.\s]|\xc2\xa0)+([^\n]+)',
+    re.IGNORECASE
+)
+MAX_ARTICLE_CHARS = 2000
+# Enough UTF-8 bytes (up to 4 per character) to hold more than MAX_ARTICLE_CHARS
+HEAD_BYTES = 4 * (MAX_ARTICLE_CHARS + 1)
+
+
+def _article_content(text, start, end):
+    """
+    Decode text[start:end], stripped and cut to MAX_ARTICLE_CHARS (+ "...")
+    
+    Long articles only have their first HEAD_BYTES decoded - enough to know
+    they get truncated and to take the kept head.
+    """
+    if end - start > HEAD_BYTES:
+        head = text[start:start + HEAD_BYTES].decode('utf-8', errors='ignore').lstrip()
+        if len(head.rstrip()) > MAX_ARTICLE_CHARS:
+            return head[:MAX_ARTICLE_CHARS] + "..."
+    
+    content = text[start:end].decode('utf-8').strip()
+    return content if len(content) <= MAX_ARTICLE_CHARS else content[:MAX_ARTICLE_CHARS] + "..."
+
+
+def parse_articles(text):
+    """
+    Cut the mapped law text into articles
+    
+    Args:
+        text: Law text as UTF-8 bytes (mmap)
+        
+    Returns:
+        tuple: (numbers, titles, contents) column lists
+    """
+    matches = list(ARTICLE_PATTERN.finditer(text))
+    
+    # Content runs from the end of each header to the start of the next one
+    bounds = [match.span() for match in matches]
+    # (bounds[1:] is one shorter on purpose - the last article is handled below)
+    contents = [
+        _article_content(text, head_end, next_start)
+        for (_, head_end), (next_start, _) in zip(bounds, bounds[1:], strict=False)
+    ]
+    # The last article gets MAX_ARTICLE_CHARS (up to 4 bytes per character in UTF-8)
+    if bounds:
+        tail = text[bounds[-1][1]:bounds[-1][1] + 4 * MAX_ARTICLE_CHARS]
+        contents.append(tail.decode('utf-8', errors='ignore')[:MAX_ARTICLE_CHARS].strip())
+    
+    numbers = [match.group(1).decode('ascii') for match in matches]
+    titles = [match.group(2).decode('utf-8').strip() for match in matches]
+    return numbers, titles, contents
+
 
 def index_darbo_kodeksas():
     """Index Darbo kodeksas from existing data"""
-    print("\n" + "="*70)
-    print("📚 INDEXING DARBO KODEKSAS")
-    print("="*70 + "\n")
+    logger.info("\n" + "="*70)
+    logger.info("📚 INDEXING DARBO KODEKSAS")
+    logger.info("="*70 + "\n")
     
     rag = LegalRAG()
     scraper = ETARScraper()
     
-    # Check if we have cached data
-    if not os.path.exists('data/darbo_kodeksas_text.txt'):
-        print("⏳ Fetching Darbo kodeksas from e-TAR...")
+    # Map the file instead of reading + decoding all of it - only the article
+    # slices are decoded. No saved copy yet -> fetch it first
+    try:
+        f = open('data/darbo_kodeksas_text.txt', 'rb')
+    except FileNotFoundError:
+        logger.info("⏳ Fetching Darbo kodeksas from e-TAR...")
         scraper.fetch_darbo_kodeksas()
+        f = open('data/darbo_kodeksas_text.txt', 'rb')
     
-    # Load the full text
-    with open('data/darbo_kodeksas_text.txt', 'r', encoding='utf-8') as f:
-        full_text = f.read()
+    with f:
+        text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     
-    # Parse into articles
-    import re
-    article_pattern = re.compile(r'(\d+)\s+straipsnis[.\s]+([^\n]+)', re.IGNORECASE)
-    matches = list(article_pattern.finditer(full_text))
-    
-    articles = []
-    for i, match in enumerate(matches):
-        article_num = match.group(1)
-        article_title = match.group(2).strip()
+    try:
+        # Parsed articles + their embeddings are cached per text version and embedding model
+        digest = hashlib.md5(text)
+        digest.update(f"{EMBEDDING_MODEL}:{os.getenv('EMBEDDER_INT8', '')}".encode())
+        cache_path = f"data/darbo_cache_{digest.hexdigest()[:8]}.npz"
         
-        # Extract content until next article
-        start = match.end()
-        if i < len(matches) - 1:
-            end = matches[i + 1].start()
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                numbers = cached['numbers'].tolist()
+                titles = cached['titles'].tolist()
+                contents = cached['contents'].tolist()
+                embeddings = cached['embeddings']
+            logger.info("✅ Using cached articles + embeddings → %s", cache_path)
         else:
-            end = start + 2000  # Last article
-        
-        content = full_text[start:end].strip()
-        
-        # Limit content length
-        if len(content) > 2000:
-            content = content[:2000] + "..."
-        
-        articles.append({
-            'number': article_num,
-            'title': article_title,
-            'content': content
-        })
+            numbers, titles, contents = parse_articles(text)
+            embeddings = None
+    finally:
+        text.close()
     
-    print(f"📊 Parsed {len(articles)} articles")
+    logger.info("📊 Parsed %d articles", len(numbers))
     
-    # Create law data structure
-    law_data = {
+    # Index into RAG
+    embeddings = rag.index_law_columns({
         'law_id': 'TAIS.dad7f3307a7011e6b969d7ae07280e89',
         'title': 'Lietuvos Respublikos darbo kodeksas',
         'category': 'darbo_teisė',
-        'articles': articles
-    }
+        'numbers': numbers,
+        'titles': titles,
+        'contents': contents,
+        'embeddings': embeddings
+    })
     
-    # Index into RAG
-    rag.index_law(law_data)
+    if not os.path.exists(cache_path):
+        np.savez_compressed(
+            cache_path,
+            numbers=np.array(numbers, dtype=str),
+            titles=np.array(titles, dtype=str),
+            contents=np.array(contents, dtype=str),
+            embeddings=embeddings
+        )
+        logger.info("✅ Saved articles + embeddings → %s", cache_path)
     
     # Show stats
     stats = rag.get_collection_stats()
-    print(f"\n📈 Total articles in database: {stats['total_articles']}")
+    logger.info("\n📈 Total articles in database: %s", stats['total_articles'])
     
-    print("\n" + "="*70)
-    print("✅ DARBO KODEKSAS INDEXED SUCCESSFULLY")
-    print("="*70)
+    logger.info("\n" + "="*70)
+    logger.info("✅ DARBO KODEKSAS INDEXED SUCCESSFULLY")
+    logger.info("="*70)
 
 
 def index_civilinis_kodeksas():
     """Index Civilinis kodeksas (placeholder for future implementation)"""
-    print("\n⚠️ Civilinis kodeksas indexing not yet implemented")
-    print("   Will be added in Phase 2")
+    logger.warning("\n⚠️ Civilinis kodeksas indexing not yet implemented")
+    logger.info("   Will be added in Phase 2")
 
 
 if __name__ == "__main__":
-    print("\n🚀 LEGAL KNOWLEDGE BASE INDEXER\n")
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+    logger.info("\n🚀 LEGAL KNOWLEDGE BASE INDEXER\n")
     
     # Index Darbo kodeksas
     index_darbo_kodeksas()
@@ -98,4 +165,4 @@ if __name__ == "__main__":
     # index_civilinis_kodeksas()
     # index_baudziamasis_kodeksas()
     
-    print("\n✅ All indexing complete!")
+    logger.info("\n✅ All indexing complete!")
@@ -3,40 +3,50 @@ Database setup script - creates tables and verifies connection
 """
 import sys
 import os
+import logging
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backend.database import engine, Base
+from backend import models  # noqa: F401 - registers the tables on Base.metadata
+
+logger = logging.getLogger(__name__)
 
 def setup_database():
     """Create all database tables"""
     try:
-        print("Creating database tables...")
+        logger.info("Creating database tables...")
         Base.metadata.create_all(bind=engine)
-        print("[OK] Database tables created successfully!")
+        logger.info("[OK] Database tables created successfully!")
+
+        # create_all skips tables that already exist, so add indexes introduced later
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
         
         # Verify tables
         from sqlalchemy import inspect
         inspector = inspect(engine)
         tables = inspector.get_table_names()
         
-        print(f"\nCreated tables: {', '.join(tables)}")
+        logger.info("\nCreated tables: %s", ', '.join(tables))
         
         # Check if users table has correct schema
         if 'users' in tables:
             columns = [col['name'] for col in inspector.get_columns('users')]
-            print(f"   Users columns: {', '.join(columns)}")
+            logger.info("   Users columns: %s", ', '.join(columns))
         
         if 'documents' in tables:
             columns = [col['name'] for col in inspector.get_columns('documents')]
-            print(f"   Documents columns: {', '.join(columns)}")
+            logger.info("   Documents columns: %s", ', '.join(columns))
             
-        print("\n[OK] Database setup complete!")
+        logger.info("\n[OK] Database setup complete!")
         
     except Exception as e:
-        print(f"[ERROR] Database setup failed: {e}")
+        logger.error("[ERROR] Database setup failed: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
     setup_database()
@@ -1,11 +1,18 @@
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+
+# One session for all requests - keep-alive reuses the TCP connection
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+SESSION.headers.update({'Connection': 'keep-alive', 'Content-Type': 'application/json'})
 
 # Test registration
 print("Testing registration...")
 try:
-    response = requests.post(
+    response = SESSION.post(
         'http://localhost:8000/api/v1/auth/register',
-        json={'email': 'test@example.com', 'password': 'test1234'},  # noqa: S106
+        data=orjson.dumps({'email': 'test@example.com', 'password': 'test1234'}),  # noqa: S106
         timeout=5
     )
 
@@ -15,12 +22,12 @@ try:
 
     if response.status_code == 200:
         print("✓ Registration successful!")
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Access Token: {data.get('access_token', 'N/A')[:20]}...")
     else:
         print("✗ Registration failed!")
         try:
-            error = response.json()
+            error = orjson.loads(response.content)
             print(f"Error: {error}")
         except Exception as e: # Fixed bare except
             print(f"Could not parse error response: {e}")
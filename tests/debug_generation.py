@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 from dotenv import load_dotenv
@@ -30,7 +31,7 @@ def debug_generation():
     }
     
     print("\n⏳ Calling generate_labor_complaint...")
-    result = generator.generate_labor_complaint(test_data)
+    result = asyncio.run(generator.generate_labor_complaint(test_data))
     
     if result:
         print("\n✅ SUCCESS: Document generated")
@@ -1,19 +1,26 @@
 ﻿"""
 Unit tests for API
 """
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 from backend.main import app
 
-client = TestClient(app)
+# Requests go straight into the ASGI app on the test's event loop (anyio's pytest plugin)
+pytestmark = pytest.mark.anyio
 
-def test_root_endpoint():
+def client():
+    """Async client calling the app in-process"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+async def test_root_endpoint():
     """Test root endpoint"""
-    response = client.get("/")
+    async with client() as ac:
+        response = await ac.get("/")
     assert response.status_code == 200
     assert "message" in response.json()
 
-def test_health_check():
+async def test_health_check():
     """Test health check"""
-    response = client.get("/health")
+    async with client() as ac:
+        response = await ac.get("/health")
     assert response.status_code == 200
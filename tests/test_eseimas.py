@@ -31,8 +31,4 @@ def test_eseimas_agent():
         print(f"❌ FAILED: Expected 0 results, got {len(results_empty)}")
 
 if __name__ == "__main__":
-    import sys
-    import os
-    # Add project root to path
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     test_eseimas_agent()
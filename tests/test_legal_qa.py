@@ -4,6 +4,8 @@ Test the Legal Advisor Q&A functionality
 
 import sys
 import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -38,33 +40,50 @@ def test_legal_qa():
         "Kas yra bandomasis laikotarpis?",
     ]
     
-    for i, question in enumerate(test_questions, 1):
-        print("="*70)
-        print(f"TEST {i}/{len(test_questions)}")
-        print("="*70)
-        print(f"\n❓ Klausimas: {question}\n")
+    # Questions are independent (vector search + Gemini call), so they run
+    # concurrently; each result is printed as soon as it arrives
+    with ThreadPoolExecutor(max_workers=len(test_questions)) as executor:
+        futures = {
+            executor.submit(advisor.answer_legal_question, question, top_k=3): (i, question)
+            for i, question in enumerate(test_questions, 1)
+        }
         
-        try:
-            result = advisor.answer_legal_question(question, top_k=3)
+        for future in as_completed(futures):
+            i, question = futures[future]
+            # Each result block is collected and written with one print call
+            lines = [
+                "="*70,
+                f"TEST {i}/{len(test_questions)}",
+                "="*70,
+                f"\n❓ Klausimas: {question}\n",
+            ]
             
-            print(f"\n📊 Confidence: {result['confidence'].upper()}")
-            print(f"📚 Sources found: {len(result['sources'])}")
-            print("\n💡 Atsakymas:")
-            print('-'*70)
-            print(result['answer'][:500] + "..." if len(result['answer']) > 500 else result['answer'])
-            print('-'*70)
+            try:
+                result = future.result()
+                
+                lines += [
+                    f"\n📊 Confidence: {result['confidence'].upper()}",
+                    f"📚 Sources found: {len(result['sources'])}",
+                    "\n💡 Atsakymas:",
+                    '-'*70,
+                    result['answer'][:500] + "..." if len(result['answer']) > 500 else result['answer'],
+                    '-'*70,
+                ]
+                
+                lines.append("\n📖 Šaltiniai:")
+                for j, source in enumerate(result['sources'][:3], 1):
+                    lines.append(f"   {j}. {source['law_title']} - Str. {source['article_number']}")
+                    lines.append(f"      {source['article_title'][:80]}...")
+                
+                lines.append(f"\n✅ TEST {i} PASSED\n")
+                
+            except Exception as e:
+                lines.append(f"\n❌ TEST {i} FAILED: {e}\n")
+                print(*lines, sep='\n')
+                traceback.print_exc()
+                continue
             
-            print("\n📖 Šaltiniai:")
-            for j, source in enumerate(result['sources'][:3], 1):
-                print(f"   {j}. {source['law_title']} - Str. {source['article_number']}")
-                print(f"      {source['article_title'][:80]}...")
-            
-            print(f"\n✅ TEST {i} PASSED\n")
-            
-        except Exception as e:
-            print(f"\n❌ TEST {i} FAILED: {e}\n")
-            import traceback
-            traceback.print_exc()
+            print(*lines, sep='\n')
     
     print("\n" + "="*70)
     print("✅ ALL TESTS COMPLETED")
@@ -0,0 +1,33 @@
+"""
+Unit tests for Smart Fetcher article parsing
+"""
+import pytest
+from backend.agents import smart_fetcher
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    """Fetcher without the sqlite cache and e-TAR scraper (parsing only)"""
+    monkeypatch.setattr(smart_fetcher, "CacheManager", lambda: None)
+    monkeypatch.setattr(smart_fetcher, "ETARScraper", lambda: None)
+    return smart_fetcher.SmartLegalFetcher()
+
+def test_parse_articles_nbsp_heading(fetcher):
+    """Headings with no-break spaces (as in e-TAR text) are parsed like plain ones"""
+    text = (
+        "Straipsnis\xa051.\xa0Darbo sutarties sąlygos\n"
+        "Šalys susitaria dėl sąlygų.\n"
+        "Straipsnis\xa052. Nuotolinis darbas\n"
+        "Darbas gali būti atliekamas nuotoliniu būdu.\n"
+        "\n"
+        "Straipsnis 53. Kitas\n"
+        "Turinys.\n"
+    )
+
+    articles = fetcher._parse_articles(text)
+
+    assert [(a['number'], a['title'], a['content']) for a in articles] == [
+        ('51', 'Darbo sutarties sąlygos', 'Šalys susitaria dėl sąlygų.'),
+        ('52', 'Nuotolinis darbas', 'Darbas gali būti atliekamas nuotoliniu būdu.'),
+        ('53', 'Kitas', 'Turinys.'),
+    ]
@@ -1,6 +1,8 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from dotenv import dotenv_values
 
 def validate_mvp():
     """
@@ -10,48 +12,35 @@ def validate_mvp():
     print("🎯 TEISINIS AI - MVP VALIDATION")
     print("="*70 + "\n")
     
-    checks = []
+    # Checks 1-4: files that must exist (name, path shown, predicate)
+    file_checks = [
+        # Check 1: Data directory exists
+        ('Data directory', 'data/', lambda: os.path.exists('data')),
+        # Check 2: Darbo kodeksas scraped (or fallback exists)
+        ('Darbo kodeksas text', 'data/darbo_kodeksas_text.txt',
+         lambda: Path('data/darbo_kodeksas_text.txt').is_file()),
+        # Check 3: Scraper Script
+        ('Scraper Script', 'backend/scrapers/etar_scraper.py',
+         lambda: Path('backend/scrapers/etar_scraper.py').is_file()),
+        # Check 4: Generator Script
+        ('Generator Script', 'backend/agents/document_generator.py',
+         lambda: Path('backend/agents/document_generator.py').is_file()),
+    ]
     
-    # Check 1: Data directory exists
-    checks.append({
-        'name': 'Data directory',
-        'passed': os.path.exists('data'),
-        'file': 'data/'
-    })
-    
-    # Check 2: Darbo kodeksas scraped (or fallback exists)
-    checks.append({
-        'name': 'Darbo kodeksas text',
-        'passed': os.path.exists('data/darbo_kodeksas_text.txt'),
-        'file': 'data/darbo_kodeksas_text.txt'
-    })
+    # Stats are independent - run them concurrently (one round-trip on network filesystems)
+    with ThreadPoolExecutor(max_workers=len(file_checks)) as executor:
+        results = list(executor.map(lambda check: check[2](), file_checks))
     
-    # Check 3: Scraper Script
-    checks.append({
-        'name': 'Scraper Script',
-        'passed': os.path.exists('backend/scrapers/etar_scraper.py'),
-        'file': 'backend/scrapers/etar_scraper.py'
-    })
-    
-    # Check 4: Generator Script
-    checks.append({
-        'name': 'Generator Script',
-        'passed': os.path.exists('backend/agents/document_generator.py'),
-        'file': 'backend/agents/document_generator.py'
-    })
+    checks = [
+        {'name': name, 'passed': passed, 'file': file}
+        for (name, file, _), passed in zip(file_checks, results, strict=True)
+    ]
     
     # Check 5: .env configured
-    env_exists = os.path.exists('.env')
-    has_key = False
-    if env_exists:
-        with open('.env', 'r') as f:
-            content = f.read()
-            # Check if key is set and not empty
-            has_key = 'GEMINI_API_KEY=' in content and 'GEMINI_API_KEY=' != content.strip().split('GEMINI_API_KEY=')[1].split('\n')[0].strip()
-            # Also check if it's not the placeholder
-            if has_key:
-                val = content.strip().split('GEMINI_API_KEY=')[1].split('\n')[0].strip()
-                if not val: has_key = False
+    env_exists = Path('.env').is_file()
+    env = dotenv_values('.env') if env_exists else {}
+    # Check if key is set and not empty
+    has_key = bool((env.get('GEMINI_API_KEY') or '').strip())
     
     checks.append({
         'name': 'Gemini API configured',
@@ -62,12 +51,11 @@ def validate_mvp():
     # Display results
     print("📊 VALIDATION RESULTS:\n")
     
-    all_passed = True
-    for i, check in enumerate(checks, 1):
-        status = "✅ PASS" if check['passed'] else "❌ FAIL"
-        print(f"{i}. {check['name']:30} {status:10} ({check['file']})")
-        if not check['passed']:
-            all_passed = False
+    all_passed = all(check['passed'] for check in checks)
+    print(*(
+        f"{i}. {check['name']:30} {'✅ PASS' if check['passed'] else '❌ FAIL':10} ({check['file']})"
+        for i, check in enumerate(checks, 1)
+    ), sep='\n')
     
     print("\n" + "="*70)
     
@@ -77,10 +65,12 @@ def validate_mvp():
         print("\n✅ MVP CORE FUNCTIONALITY: READY")
         print("\n📂 Generated files:")
         if os.path.exists('data'):
-            for f in os.listdir('data'):
-                if not f.startswith('.'):
-                    size = os.path.getsize(f'data/{f}') / 1024
-                    print(f"   - data/{f} ({size:.1f} KB)")
+            with os.scandir('data') as entries:
+                print(*(
+                    f"   - data/{entry.name} ({entry.stat().st_size / 1024:.1f} KB)"
+                    for entry in entries
+                    if not entry.name.startswith('.')
+                ), sep='\n')
     else:
         print("⚠️  SOME CHECKS FAILED")
         print("="*70)